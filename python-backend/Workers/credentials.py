@@ -0,0 +1,47 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlmodel import select
+
+from db.database import get_db_session
+from db.models.models import Credentials
+
+CREDENTIAL_CACHE_TTL = float(os.getenv("CREDENTIAL_CACHE_TTL", "300"))
+CREDENTIAL_CACHE_SIZE = int(os.getenv("CREDENTIAL_CACHE_SIZE", "1024"))
+
+# Detached Credentials rows shared by every node type. Updates and deletes are
+# pushed over the credential-updates channel; the TTL bounds staleness if a
+# message is missed. Callers must not modify the returned objects.
+_cache: "OrderedDict[str, Tuple[float, Credentials]]" = OrderedDict()
+
+
+def invalidate_credential(credential_id: Optional[str]):
+    if credential_id is None:
+        _cache.clear()
+        return
+    _cache.pop(credential_id, None)
+
+
+def get_credential(credential_id: str) -> Optional[Credentials]:
+    if not credential_id:
+        return None
+    credential_id = str(credential_id)
+    cached = _cache.get(credential_id)
+    if cached and cached[0] > time.monotonic():
+        _cache.move_to_end(credential_id)
+        return cached[1]
+    with get_db_session() as db:
+        credential = db.exec(
+            select(Credentials).where(Credentials.id == credential_id)
+        ).first()
+        if not credential:
+            _cache.pop(credential_id, None)
+            return None
+        db.expunge(credential)
+    _cache[credential_id] = (time.monotonic() + CREDENTIAL_CACHE_TTL, credential)
+    _cache.move_to_end(credential_id)
+    while len(_cache) > CREDENTIAL_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return credential
@@ -0,0 +1,47 @@
+import os
+from typing import Dict
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_CLIENT_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "60"))
+HTTP2 = os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true"
+
+# Long-lived clients keep connections (and TLS sessions) open between node
+# runs. Each name gets its own pool, so a client per upstream host also caps
+# the connections made to that host.
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _client_options() -> Dict:
+    return {
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "follow_redirects": True,
+    }
+
+
+def get_async_client(name: str = "default") -> httpx.AsyncClient:
+    client = _async_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(http2=HTTP2, **_client_options())
+        _async_clients[name] = client
+    return client
+
+
+def start_http_clients():
+    get_async_client("telegram")
+    get_async_client("resend")
+    get_async_client()
+
+
+async def close_http_clients():
+    for client in _async_clients.values():
+        await client.aclose()
+    _async_clients.clear()
@@ -3,165 +3,307 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import asyncio
-from typing import Any
-
-from sqlmodel import Session
+import signal
+import traceback
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
 
 from db.database import get_session
-from db.models.models import Execution, ExecutionStatus, Workflow
-from server.redis.index import addToQueue, getFromQueue
-from Workers.nodes.runNode.runner import runNode
+from db.models.models import Execution, ExecutionStatus
+from exports.redis import close_redis
+from server.controller.dispatch import dispatch_successors
+from server.controller.progress import (
+    pause_execution,
+    record_node_result,
+    update_execution,
+)
+from server.redis.context import resolveContext
+from server.redis.dead_letter import addToDeadLetter
+from server.redis.index import (
+    NODE_QUEUES,
+    QueuePushError,
+    ackJob,
+    getFromQueue,
+    nackJob,
+    releaseWorker,
+    runQueueMaintenance,
+)
+from server.redis.join import clearJoins
+from server.redis.pubsub import (
+    CREDENTIAL_UPDATES_CHANNEL,
+    WORKFLOW_UPDATES_CHANNEL,
+    subscribeUpdates,
+)
+from server.redis.scheduler import runScheduler, scheduleJob
+from Workers.nodes.runNode.runner import NODE_CONCURRENCY, runNode
+from Workers.credentials import invalidate_credential
+from Workers.http_clients import close_http_clients, start_http_clients
+from Workers.retry import backoff_delay, get_retry_policy, is_retryable
+from Workers.workflow_cache import get_workflow_definition, invalidate_workflow
 
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "10"))
+SHUTDOWN_TIMEOUT = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "30"))
 
-async def update_execution(
-    execution_id: str, node_id: str, node_result: Any, db: Session
-):
-    execution = db.get(Execution, execution_id)
-    if not execution:
-        return
-    cur_result = execution.result or {"nodeResults": {}}
-    new_tasks_done = (execution.tasks_done or 0) + 1
-    total_tasks = execution.total_tasks or 0
-    is_complete = new_tasks_done >= total_tasks
-    node_results = cur_result.get("nodeResults", {})
-    node_results[node_id] = {
-        "result": node_result,
-        "completedAt": asyncio.get_event_loop().time(),
-    }
-    new_result = {**cur_result, "nodeResults": node_results}
-    if is_complete:
-        new_result["completedAt"] = asyncio.get_event_loop().time()
-        execution.status = ExecutionStatus.COMPLETED
-    execution.tasks_done = new_tasks_done
-    execution.result = new_result
-    db.add(execution)
-    db.commit()
-    print(f"Execution completed: {execution_id}, {new_tasks_done}, {total_tasks}")
-
-
-async def process_jobs():
-    print("Worker started...")
-    while True:
-        try:
-            print("Waiting for a job...")
-            job = await getFromQueue(2)
-            if not job:
-                await asyncio.sleep(0.1)
-                continue
-            print("--- Received a job ---")
-            print("Job data:", job)
-
-            job_type = job.get("type")
-            node_result = {}
-            with next(get_session()) as db:
-                if job_type == "form":
-                    try:
-                        execution = db.get(Execution, job["data"]["executionId"])
-                        if execution:
-                            execution.status = ExecutionStatus.PAUSED
-                            execution.paused_node_id = job["data"]["nodeId"]
-                            db.add(execution)
-                            db.commit()
-                            print(
-                                f"Execution {execution.id} paused for form input at node {job['data']['nodeId']}."
-                            )
-                    finally:
-                        db.close()
-                    continue
-
-                if job_type == "webhook":
-                    node_result = job["data"].get("context", {})
-                elif job_type != "manual":
-                    # Try to get config from different possible paths
-                    node_data = job["data"]["nodeData"]
-                    config = (
-                        node_data.get("data", {}).get("config", {})
-                        if isinstance(node_data.get("data"), dict)
-                        else {}
-                    )
 
-                    node = {
-                        "type": job_type,
-                        "template": config.get("template", {}),
-                        "credentialId": config.get("credentialId", ""),
-                    }
-                    context = {
-                        **job["data"].get("context", {}),
-                        "executionId": job["data"]["executionId"],
+async def process_job(job: Dict[str, Any]):
+    job_type = job.get("type")
+    node_result = {}
+    with next(get_session()) as db:
+        # Producers run these inline now; jobs of these types only come from
+        # queues filled before that.
+        if job_type == "form":
+            pause_execution(db, job["data"]["executionId"], job["data"]["nodeId"])
+            return
+
+        started_at = datetime.utcnow()
+        input_context = await resolveContext(job["data"])
+        if job_type == "webhook":
+            node_result = input_context
+        elif job_type != "manual":
+            # Try to get config from different possible paths
+            node_data = job["data"]["nodeData"]
+            config = (
+                node_data.get("data", {}).get("config", {})
+                if isinstance(node_data.get("data"), dict)
+                else {}
+            )
+
+            node = {
+                "type": job_type,
+                "template": config.get("template", {}),
+                "credentialId": config.get("credentialId", ""),
+            }
+            context = {
+                **input_context,
+                "executionId": job["data"]["executionId"],
+                "nodeId": job["data"]["nodeId"],
+            }
+            print(f"Processing {job_type} node with config: {config}")
+            print(f"Context keys: {list(context.keys())}")
+            try:
+                node_result = await runNode(node, context)
+                print(f"{job_type} node completed with result: {node_result}")
+            except Exception as node_error:
+                print(f"ERROR processing {job_type} node: {node_error}")
+                traceback.print_exc()
+                attempt = job["data"].get("attempt", 1)
+                policy = get_retry_policy(job_type, node["template"])
+                if is_retryable(node_error) and attempt < policy["maxAttempts"]:
+                    delay = backoff_delay(policy, attempt)
+                    retry_job = {
+                        **job,
+                        "data": {**job["data"], "attempt": attempt + 1},
                     }
-                    print(f"Processing {job_type} node with config: {config}")
-                    print(f"Context keys: {list(context.keys())}")
-                    try:
-                        node_result = await runNode(node, context)
-                        print(f"{job_type} node completed with result: {node_result}")
-                    except Exception as node_error:
-                        print(f"ERROR processing {job_type} node: {node_error}")
-                        import traceback
-
-                        traceback.print_exc()
-                        # Mark execution as failed instead of leaving it hanging
-                        execution = db.get(Execution, job["data"]["executionId"])
-                        if execution:
-                            execution.status = ExecutionStatus.FAILED
-                            db.add(execution)
-                            db.commit()
-                        continue
-
-                if (
-                    isinstance(node_result, dict)
-                    and node_result.get("status") == ExecutionStatus.PAUSED
-                ):
-                    execution = db.get(Execution, job["data"]["executionId"])
-                    if execution:
-                        execution.status = ExecutionStatus.PAUSED
-                        execution.paused_node_id = job["data"]["nodeId"]
-                        db.add(execution)
-                        db.commit()
-                        print(
-                            f"Execution {execution.id} paused at node {job['data']['nodeId']}"
-                        )
-                        continue
-                await update_execution(
-                    job["data"]["executionId"],
-                    job["data"]["nodeId"],
-                    node_result,
-                    db,
+                    await scheduleJob(retry_job, delay)
+                    print(
+                        f"Retrying {job_type} node {job['data']['nodeId']} "
+                        f"(attempt {attempt + 1}/{policy['maxAttempts']})"
+                    )
+                    return
+                await addToDeadLetter(
+                    job, node_error, traceback.format_exc(), attempt
                 )
+                # Mark execution as failed instead of leaving it hanging
+                execution = db.get(Execution, job["data"]["executionId"])
+                if execution:
+                    record_node_result(
+                        db,
+                        job["data"]["executionId"],
+                        job["data"]["nodeId"],
+                        job_type,
+                        ExecutionStatus.FAILED,
+                        started_at,
+                        error=str(getattr(node_error, "detail", node_error)),
+                    )
+                    execution.status = ExecutionStatus.FAILED
+                    db.add(execution)
+                    db.commit()
+                    await clearJoins(job["data"]["executionId"])
+                return
 
-                workflow = db.get(Workflow, job["data"]["workflowId"])
-                if workflow and job["data"].get("connections"):
-                    nodes = workflow.nodes or {}
-                    connections = workflow.connections or {}
-                    updated_context = {
-                        **job["data"].get("context", {}),
-                        **(node_result or {}),
-                    }
-                    for next_node_id in job["data"]["connections"]:
-                        next_node_data = nodes.get(next_node_id)
-                        if not next_node_data:
-                            continue
-                        node_type = (
-                            next_node_data.get("data", {}).get("nodeType", "").lower()
-                            or next_node_data.get("type", "").lower()
-                        )
-                        next_job = {
-                            "id": f"{next_node_id}-{job['data']['executionId']}",
-                            "type": node_type,
-                            "data": {
-                                **job["data"],
-                                "nodeId": next_node_id,
-                                "nodeData": next_node_data,
-                                "credentialId": next_node_data.get("credentials"),
-                                "context": updated_context,
-                                "connections": connections.get(next_node_id, []),
-                            },
-                        }
-                        print(
-                            f"Adding {node_type} job to queue for node {next_node_id}"
-                        )
-                        await addToQueue(next_job)
+        if (
+            isinstance(node_result, dict)
+            and node_result.get("status") == ExecutionStatus.PAUSED
+        ):
+            pause_execution(db, job["data"]["executionId"], job["data"]["nodeId"])
+            return
+        await update_execution(
+            job["data"]["executionId"],
+            job["data"]["nodeId"],
+            node_result,
+            db,
+            job_type,
+            started_at,
+        )
+
+        workflow = (
+            get_workflow_definition(
+                db, job["data"]["workflowId"], job["data"].get("workflowVersion")
+            )
+            if job["data"].get("connections")
+            else None
+        )
+        if workflow:
+            await dispatch_successors(
+                workflow["plan"],
+                workflow["nodes"],
+                job["data"],
+                job["data"]["nodeId"],
+                {**input_context, **(node_result or {})},
+                db,
+            )
+
+
+async def run_job(
+    job: Dict[str, Any], slots: asyncio.Semaphore, queue: Optional[str] = None
+):
+    try:
+        await process_job(job)
+    except asyncio.CancelledError:
+        # Left unacked so the queue hands it to another worker.
+        slots.release()
+        raise
+    except QueuePushError as exe:
+        # The node ran but its successors were not enqueued. Acking would
+        # lose them, so the job goes back to be redelivered; its completion
+        # is already recorded and will not be counted twice.
+        print(f"Could not enqueue the successors of job {job.get('id')}: {exe}")
+        try:
+            await nackJob(job, queue)
+        finally:
+            slots.release()
+        return
+    except Exception as exe:
+        print(f"Error occured while processing the job: {exe}")
+        await addToDeadLetter(
+            job,
+            exe,
+            traceback.format_exc(),
+            (job.get("data") or {}).get("attempt", 1),
+        )
+    try:
+        await ackJob(job, queue)
+    finally:
+        slots.release()
+
+
+async def drain_jobs(in_flight: Set[asyncio.Task]):
+    if not in_flight:
+        return
+    print(f"Waiting up to {SHUTDOWN_TIMEOUT}s for {len(in_flight)} running job(s)...")
+    _, pending = await asyncio.wait(set(in_flight), timeout=SHUTDOWN_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"Cancelled {len(pending)} job(s) still running after shutdown timeout")
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def acquire_slot(slots: asyncio.Semaphore, stop: asyncio.Event) -> bool:
+    """Wait for a free slot, or return False as soon as shutdown starts.
+
+    With every slot busy a plain acquire would only notice the stop event
+    once a running job finished, holding off the drain until then.
+    """
+    if stop.is_set():
+        return False
+    acquire = asyncio.ensure_future(slots.acquire())
+    stop_wait = asyncio.ensure_future(stop.wait())
+    try:
+        await asyncio.wait({acquire, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop_wait.cancel()
+    if not acquire.done():
+        acquire.cancel()
+        await asyncio.wait({acquire})
+        # The slot may have been granted before the cancel landed.
+        if not acquire.cancelled():
+            slots.release()
+        return False
+    if stop.is_set():
+        slots.release()
+        return False
+    return True
+
+
+async def consume_queue(
+    queue: Optional[str],
+    concurrency: int,
+    stop: asyncio.Event,
+    in_flight: Set[asyncio.Task],
+):
+    # One slot per running job; a job is only taken off the queue once a slot
+    # is free, so the rest stay available to other workers.
+    slots = asyncio.Semaphore(concurrency)
+    running: Set[asyncio.Task] = set()
+    while await acquire_slot(slots, stop):
+        job = None
+        try:
+            job = await getFromQueue(2, queue, concurrency - len(running))
         except Exception as exe:
             print(f"Error occured while processing the job: {exe}")
+        if not job:
+            slots.release()
+            await asyncio.sleep(0.1)
+            continue
+        print("--- Received a job ---")
+        print("Job data:", job)
+        task = asyncio.create_task(run_job(job, slots, queue))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+
+async def process_jobs(stop: Optional[asyncio.Event] = None):
+    print(f"Worker started with concurrency {WORKER_CONCURRENCY}...")
+    stop = stop or asyncio.Event()
+    start_http_clients()
+    maintenance_task = asyncio.create_task(runQueueMaintenance())
+    scheduler_task = asyncio.create_task(runScheduler())
+    workflow_updates_task = asyncio.create_task(
+        subscribeUpdates(WORKFLOW_UPDATES_CHANNEL, invalidate_workflow)
+    )
+    credential_updates_task = asyncio.create_task(
+        subscribeUpdates(CREDENTIAL_UPDATES_CHANNEL, invalidate_credential)
+    )
+    in_flight: Set[asyncio.Task] = set()
+    consumers = [consume_queue(None, WORKER_CONCURRENCY, stop, in_flight)]
+    shared_limits = sorted(set(NODE_CONCURRENCY) - set(NODE_QUEUES))
+    if shared_limits:
+        print(
+            f"NODE_CONCURRENCY limits {', '.join(shared_limits)} on the shared queue; "
+            "jobs waiting for these limits hold shared slots. Add the types to "
+            "NODE_QUEUES to isolate them."
+        )
+    for node_type in NODE_QUEUES:
+        concurrency = NODE_CONCURRENCY.get(node_type, WORKER_CONCURRENCY)
+        print(f"Consuming dedicated {node_type} queue with concurrency {concurrency}")
+        consumers.append(consume_queue(node_type, concurrency, stop, in_flight))
+    try:
+        await asyncio.gather(*consumers)
+    finally:
+        maintenance_task.cancel()
+        scheduler_task.cancel()
+        workflow_updates_task.cancel()
+        credential_updates_task.cancel()
+        await drain_jobs(in_flight)
+        await close_http_clients()
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    # Jobs a previous process with this WORKER_ID still held go back first.
+    await releaseWorker()
+    try:
+        await process_jobs(stop)
+    finally:
+        await releaseWorker()
+        await close_redis()
 
 
-asyncio.run(process_jobs())
+if __name__ == "__main__":
+    asyncio.run(main())
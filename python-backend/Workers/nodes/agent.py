@@ -1,19 +1,23 @@
 import os
 import sys
+import time
 from typing import Any, Dict
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 import pystache
 from fastapi import HTTPException
-from langchain import hub
-from langchain.agents import AgentExecutor, create_react_agent
-from sqlmodel import select
 
-from db.database import get_db_session, get_session
-from db.models.models import Credentials, Platform
-from Workers.nodes.agents.llm import create_llm
-from Workers.nodes.agents.tools.web_search import web_search
-from Workers.nodes.agents.tools.web_summary import summary_content
+from Workers.credentials import get_credential
+from Workers.nodes.agents.llm import LLM_MODELS
+from Workers.nodes.agents.pool import get_agent, invalidate_agent
+from Workers.nodes.agents.response_cache import (
+    cache_key,
+    cache_options,
+    get_cached_response,
+    record_lookup,
+    store_response,
+)
+from Workers.nodes.agents.streaming import ExecutionStreamHandler
 
 node_details = {
     "type": "agent",
@@ -23,8 +27,6 @@ node_details = {
     "icon": "🤖",
 }
 
-prompt_template = hub.pull("hwchase17/react")
-
 
 async def run_agent(
     credential_id: str, template: Dict[str, Any], context: Dict[str, Any]
@@ -33,24 +35,58 @@ async def run_agent(
     if not raw_prompt:
         raise HTTPException(status_code=400, detail="Prompt should be provided")
     prompt = pystache.render(raw_prompt, context)
-    db = get_db_session()
+    stream = ExecutionStreamHandler(context.get("executionId"), context.get("nodeId"))
+    await stream.publish("start", {})
     try:
-        llm_credential = db.exec(
-            select(Credentials).where(Credentials.id == credential_id)
-        ).first()
+        llm_credential = get_credential(credential_id)
         if not llm_credential:
+            invalidate_agent(credential_id)
             raise HTTPException(status_code=400, detail="LLM credential not found")
 
-        llm = create_llm(llm_credential)
-        tools = [web_search, summary_content]
-        agent = create_react_agent(llm, tools, prompt_template)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-        response = await agent_executor.ainvoke({"input": prompt})
+        agent = get_agent(llm_credential)
+        options = cache_options(template)
+        if options:
+            key = cache_key(
+                LLM_MODELS.get(llm_credential.platform),
+                llm_credential.platform,
+                prompt,
+                [tool.name for tool in agent["tools"]],
+            )
+            cached = await get_cached_response(key)
+            if cached:
+                await stream.publish(
+                    "final", {"output": cached["result"], "cached": True}
+                )
+                return {
+                    "result": cached["result"],
+                    "cache": {
+                        "hit": True,
+                        "savedMs": cached["durationMs"],
+                        "hitRate": await record_lookup(True),
+                    },
+                }
+
+        started = time.monotonic()
+        response = await agent["executor"].ainvoke(
+            {"input": prompt}, config={"callbacks": [stream]}
+        )
         result = response.get("output")
-        return {"result": result}
+        if not options:
+            return {"result": result}
+        duration_ms = int((time.monotonic() - started) * 1000)
+        await store_response(
+            key, {"result": result, "durationMs": duration_ms}, options["ttl"]
+        )
+        return {
+            "result": result,
+            "cache": {
+                "hit": False,
+                "savedMs": 0,
+                "hitRate": await record_lookup(False),
+            },
+        }
     except Exception as e:
         import traceback
         error_message = f"Agent execution failed:\n{traceback.format_exc()}"
+        await stream.publish("error", {"error": str(e)})
         return {"result": error_message}
-    finally:
-        db.close()
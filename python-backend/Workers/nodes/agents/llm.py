@@ -10,15 +10,26 @@ from langchain_groq import ChatGroq
 
 from db.models.models import Credentials, Platform
 
+LLM_MODELS = {
+    Platform.GROQ: "llama-3.1-8b-instant",
+    Platform.GEMINI: "gemini-1.5-pro-latest",
+}
+
 
 def create_llm(credentials: Credentials) -> Union[BaseChatModel, None]:
     api_key = credentials.data.get("apiKey")
     if not api_key:
         raise ValueError("API Key not found")
     if credentials.platform == Platform.GROQ:
-        return ChatGroq(api_key=api_key, model="llama-3.1-8b-instant")
+        return ChatGroq(
+            api_key=api_key, model=LLM_MODELS[Platform.GROQ], streaming=True
+        )
     elif credentials.platform == Platform.GEMINI:
-        return ChatGoogleGenerativeAI(google_api_key=api_key, model="gemini-1.5-pro-latest")
+        return ChatGoogleGenerativeAI(
+            google_api_key=api_key,
+            model=LLM_MODELS[Platform.GEMINI],
+            streaming=True,
+        )
     else:
         print(f"Unsupported LLM Platform: {credentials.platform}")
         return None
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from langchain.agents import AgentExecutor, create_react_agent
+
+from db.models.models import Credentials
+from Workers.nodes.agents.llm import create_llm
+from Workers.nodes.agents.prompt import react_prompt
+from Workers.nodes.agents.tools.web_search import web_search
+from Workers.nodes.agents.tools.web_summary import summary_content
+
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "32"))
+
+# Built LLM clients and agent executors per credential. An executor keeps no
+# state between runs, so concurrent agent nodes using the same credential
+# share one. Entries remember a fingerprint of the credential they were built
+# from; when the credential cache hands back a changed credential the entry
+# is rebuilt.
+_pool: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+
+
+def credential_fingerprint(credential: Credentials) -> str:
+    payload = json.dumps(
+        [str(credential.platform), credential.data], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_agent(credential: Credentials) -> Dict[str, Any]:
+    llm = create_llm(credential)
+    if llm is None:
+        raise ValueError(f"Unsupported LLM Platform: {credential.platform}")
+    tools = [web_search, summary_content]
+    agent = create_react_agent(llm, tools, react_prompt)
+    return {
+        "llm": llm,
+        "tools": tools,
+        "executor": AgentExecutor(agent=agent, tools=tools, verbose=True),
+    }
+
+
+def get_agent(credential: Credentials) -> Dict[str, Any]:
+    key = str(credential.id)
+    fingerprint = credential_fingerprint(credential)
+    cached = _pool.get(key)
+    if cached and cached[0] == fingerprint:
+        _pool.move_to_end(key)
+        return cached[1]
+    agent = build_agent(credential)
+    _pool[key] = (fingerprint, agent)
+    _pool.move_to_end(key)
+    while len(_pool) > AGENT_POOL_SIZE:
+        _pool.popitem(last=False)
+    return agent
+
+
+def invalidate_agent(credential_id: str):
+    _pool.pop(str(credential_id), None)
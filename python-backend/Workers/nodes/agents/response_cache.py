@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from exports.redis import redis_client
+from server.redis.index import QUEUE_BACKEND
+
+LLM_CACHE_PREFIX = "llm-cache"
+LLM_CACHE_INDEX = f"{LLM_CACHE_PREFIX}:index"
+LLM_CACHE_STATS = f"{LLM_CACHE_PREFIX}:stats"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# Stores a response and trims the cache to its size cap. The index holds
+# every cached key scored by its expiry time, so expired keys are dropped
+# from it first and then the ones closest to expiring.
+STORE_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[3] + ARGV[2], KEYS[1])
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if excess > 0 then
+    local evicted = redis.call('ZRANGE', KEYS[2], 0, excess - 1)
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, excess - 1)
+    redis.call('DEL', unpack(evicted))
+end
+return excess
+"""
+store_script = redis_client.register_script(STORE_SCRIPT)
+
+# Used with the in-process queue, where the worker runs without Redis.
+_local_responses: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_local_stats = {"hits": 0, "misses": 0}
+
+
+def cache_options(template: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # template.cache is either true or {"enabled": true, "ttl": seconds}.
+    cache = template.get("cache")
+    if cache is True:
+        cache = {}
+    if not isinstance(cache, dict) or not cache.get("enabled", True):
+        return None
+    return {"ttl": int(cache.get("ttl") or LLM_CACHE_TTL)}
+
+
+def cache_key(model: Optional[str], platform: Any, prompt: str, tools: List[str]):
+    payload = json.dumps(
+        [model, str(platform), prompt, sorted(tools)], ensure_ascii=False
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{LLM_CACHE_PREFIX}:{digest}"
+
+
+async def get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    if QUEUE_BACKEND == "memory":
+        expires_at, response = _local_responses.get(key, (0, None))
+        if response is None or expires_at < time.time():
+            _local_responses.pop(key, None)
+            return None
+        return response
+    payload = await redis_client.get(key)
+    return json.loads(payload) if payload else None
+
+
+async def store_response(key: str, response: Dict[str, Any], ttl: int):
+    now = time.time()
+    if QUEUE_BACKEND == "memory":
+        _local_responses[key] = (now + ttl, response)
+        _local_responses.move_to_end(key)
+        while len(_local_responses) > LLM_CACHE_MAX_ENTRIES:
+            _local_responses.popitem(last=False)
+        return
+    await store_script(
+        keys=[key, LLM_CACHE_INDEX],
+        args=[json.dumps(response), ttl, int(now), LLM_CACHE_MAX_ENTRIES],
+    )
+
+
+async def record_lookup(hit: bool) -> float:
+    """Count a lookup and return the cache-wide hit rate."""
+    field = "hits" if hit else "misses"
+    if QUEUE_BACKEND == "memory":
+        _local_stats[field] += 1
+        stats = _local_stats
+    else:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(LLM_CACHE_STATS, field, 1)
+            pipe.hgetall(LLM_CACHE_STATS)
+            _, stats = await pipe.execute()
+    hits = int(stats.get("hits", 0))
+    total = hits + int(stats.get("misses", 0))
+    return round(hits / total, 4) if total else 0.0
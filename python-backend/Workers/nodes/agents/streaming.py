@@ -0,0 +1,70 @@
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from server.redis.execution_stream import publishExecutionEvent
+
+AGENT_STREAM_FLUSH_CHARS = int(os.getenv("AGENT_STREAM_FLUSH_CHARS", "64"))
+AGENT_STREAM_FLUSH_INTERVAL = float(os.getenv("AGENT_STREAM_FLUSH_INTERVAL", "0.2"))
+MAX_OBSERVATION_LENGTH = 2000
+
+
+class ExecutionStreamHandler(AsyncCallbackHandler):
+    """Forwards an agent run's tokens and steps to the execution's stream.
+
+    Created per run and passed in the invoke config, so pooled executors
+    stay shared. Tokens are batched to keep the number of XADDs down; the
+    first one goes out straight away.
+    """
+
+    def __init__(self, execution_id: str, node_id: Optional[str] = None):
+        self.execution_id = execution_id
+        self.node_id = node_id
+        self._tokens: List[str] = []
+        self._pending_chars = 0
+        self._flushed_at = 0.0
+
+    async def publish(self, event: str, data: Dict[str, Any]):
+        await publishExecutionEvent(
+            self.execution_id, event, {"nodeId": self.node_id, **data}
+        )
+
+    async def flush(self):
+        if not self._tokens:
+            return
+        text = "".join(self._tokens)
+        self._tokens = []
+        self._pending_chars = 0
+        self._flushed_at = time.monotonic()
+        await self.publish("token", {"text": text})
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any):
+        self._tokens.append(token)
+        self._pending_chars += len(token)
+        if (
+            self._pending_chars >= AGENT_STREAM_FLUSH_CHARS
+            or time.monotonic() - self._flushed_at >= AGENT_STREAM_FLUSH_INTERVAL
+        ):
+            await self.flush()
+
+    async def on_llm_end(self, response: Any, **kwargs: Any):
+        await self.flush()
+
+    async def on_llm_error(self, error: BaseException, **kwargs: Any):
+        await self.flush()
+
+    async def on_agent_action(self, action: AgentAction, **kwargs: Any):
+        await self.flush()
+        await self.publish("action", {"tool": action.tool, "input": action.tool_input})
+
+    async def on_tool_end(self, output: Any, **kwargs: Any):
+        await self.publish(
+            "observation", {"output": str(output)[:MAX_OBSERVATION_LENGTH]}
+        )
+
+    async def on_agent_finish(self, finish: AgentFinish, **kwargs: Any):
+        await self.flush()
+        await self.publish("final", {"output": finish.return_values.get("output")})
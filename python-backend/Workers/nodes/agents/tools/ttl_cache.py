@@ -0,0 +1,28 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+WEB_TOOL_CACHE_TTL = float(os.getenv("WEB_TOOL_CACHE_TTL", "900"))
+WEB_TOOL_CACHE_SIZE = int(os.getenv("WEB_TOOL_CACHE_SIZE", "256"))
+
+
+class TTLCache:
+    def __init__(self, ttl: float = WEB_TOOL_CACHE_TTL, size: int = WEB_TOOL_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        expires_at, value = self._entries.get(key, (0, None))
+        if value is None or expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
@@ -1,22 +1,38 @@
 import os
+from typing import Optional
 
 from dotenv import load_dotenv
 from langchain.tools import tool
 from langchain_tavily import TavilySearch
 
+from Workers.nodes.agents.tools.ttl_cache import TTLCache
+
 load_dotenv()
 
+_search: Optional[TavilySearch] = None
+_results = TTLCache()
+
+
+def get_search() -> TavilySearch:
+    global _search
+    if _search is None:
+        _search = TavilySearch(api_key=os.getenv("TAVILY_API_KEY"), max_results=3)
+    return _search
+
 
 @tool(description="Search the web to get the latest information")
-def web_search(query: str):
+async def web_search(query: str):
+    key = " ".join(query.lower().split())
+    cached = _results.get(key)
+    if cached is not None:
+        return cached
     try:
-        api_key = os.getenv("TAVILY_API_KEY")
-        search = TavilySearch(api_key=api_key, max_results=3)
-        response = search.invoke(query)
+        response = await get_search().ainvoke(query)
         results = response if isinstance(response, list) else response.get("results", [])
         formatted_response = "\n".join(
             [f"URL: {res['url']}\\nContent: {res['content']}\n---" for res in results]
         )
+        _results.set(key, formatted_response)
         return formatted_response
     except Exception as e:
         return f"Error while searching the web: {e}"
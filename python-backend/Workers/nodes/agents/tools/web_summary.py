@@ -1,29 +1,72 @@
-import requests
+import asyncio
+import os
+import re
+from typing import Optional
+
 from bs4 import BeautifulSoup
 from langchain.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from Workers.http_clients import get_async_client
+from Workers.nodes.agents.tools.ttl_cache import TTLCache
 
-@tool(
-    description="Generate a text summary for the text content of the wbepage provided by the user"
-)
-def summary_content(url: str):
-    try:
-        response = requests.get(url, timeout=15)
+WEB_TOOL_CONCURRENCY = int(os.getenv("WEB_TOOL_CONCURRENCY", "4"))
+MAX_CONTENT_LENGTH = 15000
+
+_llm: Optional[ChatGoogleGenerativeAI] = None
+_summaries = TTLCache()
+# Pages fetched and summarised at once in this worker, across agent runs.
+_page_slots = asyncio.Semaphore(WEB_TOOL_CONCURRENCY)
+
+
+def get_summary_llm() -> ChatGoogleGenerativeAI:
+    global _llm
+    if _llm is None:
+        _llm = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0)
+    return _llm
+
+
+def extract_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    root = soup.body or soup
+    return root.get_text(separator="\n", strip=True)
+
+
+async def summarize_page(url: str) -> str:
+    cached = _summaries.get(url)
+    if cached is not None:
+        return cached
+    async with _page_slots:
+        response = await get_async_client("web").get(url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        if soup.body:
-            text_content = soup.body.get_text(separator="\\n", strip=True)
-        else:
-            text_content = soup.get_text(separator="\\n", strip=True)
+        # Parsing is CPU-bound, so it runs off the event loop.
+        text_content = await asyncio.to_thread(extract_text, response.text)
         if not text_content:
             return "Could not find any text content on the page"
-        max_length = 15000
-        if len(text_content) > max_length:
-            return text_content[:max_length] + "\\n... (content truncated)"
-        llm = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0)
+        if len(text_content) > MAX_CONTENT_LENGTH:
+            text_content = (
+                text_content[:MAX_CONTENT_LENGTH] + "\n... (content truncated)"
+            )
         prompt = f"Please provide a concise summary of the following web page content: \n\n{text_content}"
-        summary_response = llm.invoke(prompt)
-        return summary_response.content
-    except Exception as e:
-        print(f"Error occured while summarising the content: {e}")
+        summary_response = await get_summary_llm().ainvoke(prompt)
+    _summaries.set(url, summary_response.content)
+    return summary_response.content
+
+
+@tool(
+    description="Generate a text summary for the text content of the webpage provided by the user. Several URLs can be given, separated by commas"
+)
+async def summary_content(url: str):
+    urls = list(dict.fromkeys(part for part in re.split(r"[,\s]+", url) if part))
+    summaries = await asyncio.gather(
+        *(summarize_page(page_url) for page_url in urls), return_exceptions=True
+    )
+    results = []
+    for page_url, summary in zip(urls, summaries):
+        if isinstance(summary, Exception):
+            print(f"Error occured while summarising the content: {summary}")
+            summary = f"Error while summarising the page: {summary}"
+        if len(urls) > 1:
+            summary = f"URL: {page_url}\nSummary: {summary}\n---"
+        results.append(summary)
+    return "\n".join(results)
@@ -1,13 +1,14 @@
-import asyncio
 from typing import Any, Dict
 
+import httpx
 import pystache
-import resend
 from fastapi import HTTPException
-from sqlmodel import select
 
-from db.database import get_db_session
-from db.models.models import Credentials, ExecutionStatus
+from db.models.models import ExecutionStatus
+from Workers.credentials import get_credential
+from Workers.http_clients import get_async_client
+
+RESEND_EMAILS_URL = "https://api.resend.com/emails"
 
 node_details = {
     "type": "email",
@@ -21,9 +22,7 @@ node_details = {
 async def send_Email(
     credential_id: str, template: Dict[str, Any], context: Dict[str, Any]
 ):
-    db = get_db_session()
-    statement = select(Credentials).where(Credentials.id == credential_id)
-    credential = db.exec(statement).first()
+    credential = get_credential(credential_id)
     if not credential:
         raise HTTPException(status_code=400, detail="Credential not found")
     data = credential.data
@@ -41,15 +40,27 @@ async def send_Email(
         "html": body,
         "reply_to": reply_to,
     }
+    # The key goes with each request; the resend SDK keeps it in a module
+    # global, which concurrent email nodes with different credentials share.
     try:
-
-        def _send_email():
-            resend.api_key = api_Key
-            return resend.Emails.send(params)
-
-        res = await asyncio.to_thread(_send_email)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Failed to send the email: {exc}")
+        response = await get_async_client("resend").post(
+            RESEND_EMAILS_URL,
+            json=params,
+            headers={"Authorization": f"Bearer {api_Key}"},
+        )
+    except httpx.HTTPError as exc:
+        # Network failures are worth retrying.
+        raise HTTPException(
+            status_code=503, detail=f"Failed to send the email: {exc}"
+        )
+    if response.is_error:
+        code = response.status_code
+        status_code = 400 if 400 <= code < 500 and code != 429 else 503
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"Failed to send the email: {response.text}",
+        )
+    res = response.json()
     if template.get("waitForReply"):
         print("Email sent.Workflow will be paused now for reply")
         return {"status": ExecutionStatus.PAUSED}
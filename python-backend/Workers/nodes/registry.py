@@ -0,0 +1,61 @@
+import ast
+import importlib
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+NODES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Handler for each node type, imported on first use. Node modules pull in
+# their SDKs (langchain for the agent, ...) at import time, so a
+# worker only pays for the node types it actually runs.
+NODE_HANDLERS = {
+    "email": ("Workers.nodes.email", "send_Email"),
+    "telegram": ("Workers.nodes.telegram", "send_Telegram_Msg"),
+    "form": ("Workers.nodes.form", "run_form"),
+    "agent": ("Workers.nodes.agent", "run_agent"),
+}
+
+_node_details: Optional[List[Dict[str, Any]]] = None
+_handlers: Dict[str, Callable] = {}
+
+
+def read_node_details(path: str) -> Optional[Dict[str, Any]]:
+    # node_details is a plain dict literal, so it is read from the source
+    # without executing the module.
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), filename=path)
+    for statement in tree.body:
+        if (
+            isinstance(statement, ast.Assign)
+            and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name)
+            and statement.targets[0].id == "node_details"
+        ):
+            try:
+                return ast.literal_eval(statement.value)
+            except ValueError:
+                print(f"node_details in {path} is not a literal, skipping")
+                return None
+    return None
+
+
+def get_node_details() -> List[Dict[str, Any]]:
+    global _node_details
+    if _node_details is None:
+        details = []
+        for filename in sorted(os.listdir(NODES_DIR)):
+            if filename.endswith(".py") and not filename.startswith("__"):
+                node_details = read_node_details(os.path.join(NODES_DIR, filename))
+                if node_details:
+                    details.append(node_details)
+        _node_details = details
+    return _node_details
+
+
+def get_node_handler(node_type: str) -> Optional[Callable]:
+    handler = _handlers.get(node_type)
+    if handler is None and node_type in NODE_HANDLERS:
+        module_name, handler_name = NODE_HANDLERS[node_type]
+        handler = getattr(importlib.import_module(module_name), handler_name)
+        _handlers[node_type] = handler
+    return handler
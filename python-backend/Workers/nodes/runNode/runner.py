@@ -1,28 +1,42 @@
+import asyncio
+import os
+from contextlib import nullcontext
 from typing import Any, Dict
 from fastapi import HTTPException
-from ..agent import run_agent
-from ..email import send_Email
-from ..form import run_form
-from ..telegram import send_Telegram_Msg
+from ..registry import get_node_handler
+
+# "agent=4,email=20" caps how many nodes of each type run at once in a worker
+# process. The cap is taken after the job has left the queue, so on the shared
+# queue a job waiting for it still holds one of the consumer's slots. Only
+# types also listed in NODE_QUEUES are kept from holding up the others; their
+# dedicated consumer runs with the cap as its concurrency.
+NODE_CONCURRENCY: Dict[str, int] = {
+    node_type.strip().lower(): int(limit)
+    for node_type, _, limit in (
+        item.partition("=")
+        for item in os.getenv("NODE_CONCURRENCY", "").split(",")
+        if "=" in item
+    )
+}
+node_limits = {
+    node_type: asyncio.Semaphore(limit) for node_type, limit in NODE_CONCURRENCY.items()
+}
 
 
 async def runNode(node: Any, context: Dict[str, Any]):
+    async with node_limits.get(node.get("type")) or nullcontext():
+        return await dispatchNode(node, context)
+
+
+async def dispatchNode(node: Any, context: Dict[str, Any]):
     try:
         node_type = node.get("type")
-        if node_type == "email":
-            return await send_Email(node["credentialId"], node["template"], context)
-        elif node_type == "telegram":
-            return await send_Telegram_Msg(
-                node["credentialId"], node["template"], context
-            )
-        elif node_type == "form":
-            return await run_form(node["credentialId"], node["template"], context)
-        elif node_type == "agent":
-            return await run_agent(node["credentialId"], node["template"], context)
-        else:
+        handler = get_node_handler(node_type)
+        if handler is None:
             raise HTTPException(
                 status_code=400, detail=f"Node type is not found: {node_type}"
             )
+        return await handler(node["credentialId"], node["template"], context)
     except HTTPException:
         raise
     except Exception:
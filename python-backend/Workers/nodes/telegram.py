@@ -1,7 +1,5 @@
 from typing import Any, Dict
 
-import httpx
-
 node_details = {
     "type": "telegram",
     "name": "Telegram Bot",
@@ -10,18 +8,15 @@ node_details = {
     "icon": "📱"
 }
 import pystache
-from db.database import get_db_session
-from db.models.models import Credentials
 from fastapi import HTTPException
-from sqlmodel import select
+from Workers.credentials import get_credential
+from Workers.http_clients import get_async_client
 
 
 async def send_Telegram_Msg(
     credential_id: str, template: Dict[str, Any], context: Dict[str, Any]
 ):
-    db = get_db_session()
-    statement = select(Credentials).where(Credentials.id == credential_id)
-    credential = db.exec(statement).first()
+    credential = get_credential(credential_id)
     if not credential:
         raise HTTPException(status_code=400, detail="Telegram credential not found")
     data = credential.data
@@ -34,9 +29,12 @@ async def send_Telegram_Msg(
     message_text = pystache.render(template.get("message", ""), context)
     url = f"https://api.telegram.org/bot{api_Key}/sendMessage"
     payload = {"chat_id": chat_id, "text": message_text}
-    async with httpx.AsyncClient() as client:
-        res = await client.post(url, json=payload)
-        text = res.text
-        if res.status_code != 200:
-            raise HTTPException(status_code=502, detail="Telegram api error")
-        return {"msg": message_text, "msg_sent": text}
+    res = await get_async_client("telegram").post(url, json=payload)
+    text = res.text
+    if res.status_code == 429 or res.status_code >= 500:
+        raise HTTPException(
+            status_code=503, detail=f"Telegram api unavailable: {res.status_code}"
+        )
+    if res.status_code != 200:
+        raise HTTPException(status_code=400, detail="Telegram api error")
+    return {"msg": message_text, "msg_sent": text}
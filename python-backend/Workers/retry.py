@@ -0,0 +1,42 @@
+import random
+from typing import Any, Dict
+
+from fastapi import HTTPException
+
+DEFAULT_RETRY_POLICY = {
+    "maxAttempts": 1,
+    "backoffSeconds": 2.0,
+    "backoffFactor": 2.0,
+    "maxBackoffSeconds": 300.0,
+    "jitter": 0.5,
+}
+
+# Outbound notification nodes see transient 429s and 5xx from their APIs.
+NODE_RETRY_POLICIES: Dict[str, Dict[str, Any]] = {
+    "email": {"maxAttempts": 3},
+    "telegram": {"maxAttempts": 3},
+}
+
+
+def get_retry_policy(node_type: str, template: Dict[str, Any]) -> Dict[str, Any]:
+    # A node can override any field through "retry" in its template.
+    return {
+        **DEFAULT_RETRY_POLICY,
+        **NODE_RETRY_POLICIES.get(node_type, {}),
+        **(template.get("retry") or {}),
+    }
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, HTTPException):
+        return error.status_code == 429 or error.status_code >= 500
+    return True
+
+
+def backoff_delay(policy: Dict[str, Any], attempt: int) -> float:
+    delay = float(policy["backoffSeconds"]) * float(policy["backoffFactor"]) ** (
+        attempt - 1
+    )
+    delay = min(delay, float(policy["maxBackoffSeconds"]))
+    jitter = min(max(float(policy["jitter"]), 0.0), 1.0)
+    return random.uniform(delay * (1 - jitter), delay)
@@ -0,0 +1,160 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import asyncio
+import json
+import multiprocessing
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES") or os.cpu_count() or 1)
+WORKER_ID_PREFIX = os.getenv("WORKER_ID_PREFIX") or socket.gethostname()
+WORKER_HEALTH_FILE = os.getenv("WORKER_HEALTH_FILE", "/tmp/worker-health.json")
+WORKER_HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "5"))
+# A child whose event loop has not beaten for this long is restarted.
+WORKER_HEARTBEAT_TIMEOUT = float(os.getenv("WORKER_HEARTBEAT_TIMEOUT", "120"))
+SHUTDOWN_TIMEOUT = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "30"))
+MAX_RESTART_DELAY = 30.0
+
+# Fork keeps the children cheap to start; nothing that holds sockets or an
+# event loop is imported in the supervisor before forking.
+mp = multiprocessing.get_context("fork")
+
+
+def worker_id(slot: int) -> str:
+    return f"{WORKER_ID_PREFIX}-{slot}"
+
+
+def run_worker(slot: int, heartbeats):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Stable per slot, so a restarted child takes over its predecessor's
+    # processing list instead of leaving it to the visibility timeout.
+    os.environ["WORKER_ID"] = worker_id(slot)
+    from Workers.index import main
+
+    async def beat():
+        while True:
+            heartbeats[slot] = time.time()
+            await asyncio.sleep(WORKER_HEARTBEAT_INTERVAL)
+
+    async def run():
+        beat_task = asyncio.create_task(beat())
+        try:
+            await main()
+        finally:
+            beat_task.cancel()
+
+    asyncio.run(run())
+
+
+class Supervisor:
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.heartbeats = mp.Array("d", processes, lock=False)
+        self.children: List[Optional[multiprocessing.Process]] = [None] * processes
+        self.restarts = [0] * processes
+        self.restart_at = [0.0] * processes
+        self.stopping = False
+
+    def start(self, slot: int):
+        self.heartbeats[slot] = time.time()
+        child = mp.Process(
+            target=run_worker,
+            args=(slot, self.heartbeats),
+            name=worker_id(slot),
+            daemon=False,
+        )
+        child.start()
+        self.children[slot] = child
+        print(f"Started worker {worker_id(slot)} with PID {child.pid}")
+
+    def check(self, slot: int):
+        child = self.children[slot]
+        now = time.time()
+        if child is not None and child.is_alive():
+            if now - self.heartbeats[slot] <= WORKER_HEARTBEAT_TIMEOUT:
+                return
+            print(f"Worker {worker_id(slot)} stopped heartbeating, killing it")
+            child.kill()
+            child.join()
+        if child is not None:
+            print(f"Worker {worker_id(slot)} exited with code {child.exitcode}")
+            self.children[slot] = None
+            self.restarts[slot] += 1
+            # Back off children that keep crashing on startup.
+            delay = min(2 ** min(self.restarts[slot], 5), MAX_RESTART_DELAY)
+            self.restart_at[slot] = now + delay
+        if now >= self.restart_at[slot]:
+            self.start(slot)
+
+    def health(self) -> Dict:
+        now = time.time()
+        workers = []
+        for slot, child in enumerate(self.children):
+            alive = child is not None and child.is_alive()
+            age = now - self.heartbeats[slot]
+            workers.append(
+                {
+                    "workerId": worker_id(slot),
+                    "pid": child.pid if child else None,
+                    "alive": alive,
+                    "heartbeatAge": round(age, 1),
+                    "restarts": self.restarts[slot],
+                    "healthy": alive and age <= WORKER_HEARTBEAT_TIMEOUT,
+                }
+            )
+        return {
+            "supervisorPid": os.getpid(),
+            "updatedAt": now,
+            "healthy": sum(1 for worker in workers if worker["healthy"]),
+            "processes": self.processes,
+            "workers": workers,
+        }
+
+    def write_health(self):
+        tmp_path = f"{WORKER_HEALTH_FILE}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.health(), f)
+            os.replace(tmp_path, WORKER_HEALTH_FILE)
+        except OSError as error:
+            print(f"Error while writing worker health file: {error}")
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def shutdown(self):
+        children = [child for child in self.children if child and child.is_alive()]
+        for child in children:
+            child.terminate()
+        # Children drain their running jobs for up to SHUTDOWN_TIMEOUT.
+        deadline = time.time() + SHUTDOWN_TIMEOUT + 5
+        for child in children:
+            child.join(max(deadline - time.time(), 0))
+            if child.is_alive():
+                print(f"Worker {child.name} did not stop in time, killing it")
+                child.kill()
+                child.join()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print(f"Supervisor starting {self.processes} worker process(es)...")
+        for slot in range(self.processes):
+            self.start(slot)
+        while not self.stopping:
+            for slot in range(self.processes):
+                self.check(slot)
+            self.write_health()
+            time.sleep(1)
+        print("Supervisor shutting down...")
+        self.shutdown()
+        self.write_health()
+
+
+if __name__ == "__main__":
+    Supervisor(WORKER_PROCESSES).run()
@@ -0,0 +1,53 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlmodel import Session
+
+from db.models.models import Workflow
+from server.controller.plan import get_plan
+
+WORKFLOW_CACHE_SIZE = int(os.getenv("WORKFLOW_CACHE_SIZE", "512"))
+
+# The latest definition of each workflow, as the database only keeps that
+# one. Updates and deletes arrive on the workflow-updates channel. A job
+# stamped with a newer workflowVersion than the cached one means a message
+# was missed, so the definition is read again. Jobs with an older version
+# use the cached latest definition, which is what the database would return.
+_definitions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _remember(definition: Dict[str, Any]):
+    _definitions[definition["id"]] = definition
+    _definitions.move_to_end(definition["id"])
+    while len(_definitions) > WORKFLOW_CACHE_SIZE:
+        _definitions.popitem(last=False)
+
+
+def invalidate_workflow(workflow_id: Optional[str]):
+    if workflow_id is None:
+        _definitions.clear()
+        return
+    _definitions.pop(workflow_id, None)
+
+
+def get_workflow_definition(
+    db: Session, workflow_id: str, version: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    workflow_id = str(workflow_id)
+    cached = _definitions.get(workflow_id)
+    if cached and (version is None or cached["version"] >= version):
+        _definitions.move_to_end(workflow_id)
+        return cached
+    workflow = db.get(Workflow, workflow_id)
+    if not workflow:
+        return None
+    definition = {
+        "id": workflow_id,
+        "version": workflow.version,
+        "nodes": workflow.nodes or {},
+        "connections": workflow.connections or {},
+        "plan": get_plan(workflow),
+    }
+    _remember(definition)
+    return definition
@@ -0,0 +1,50 @@
+"""Add node_result table
+
+Revision ID: 3c4d5e6f7a8b
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c4d5e6f7a8b'
+down_revision: Union[str, Sequence[str], None] = '1a2b3c4d5e6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create node_result and copy existing execution.result nodeResults into it."""
+    # create_tables() runs create_all before migrations, so the table may exist.
+    if not sa.inspect(op.get_bind()).has_table('node_result'):
+        op.create_table('node_result',
+        sa.Column('execution_id', sa.Uuid(), nullable=False),
+        sa.Column('node_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('node_type', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'PAUSED', 'COMPLETED', 'FAILED', name='executionstatus', create_type=False), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=False),
+        sa.Column('duration_ms', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.ForeignKeyConstraint(['execution_id'], ['execution.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('execution_id', 'node_id')
+        )
+    op.execute("""
+        INSERT INTO node_result (execution_id, node_id, status, completed_at, result)
+        SELECT e.id, node.key, 'COMPLETED', e.created_at, node.value -> 'result'
+        FROM execution e, json_each(e.result -> 'nodeResults') AS node
+        WHERE json_typeof(e.result -> 'nodeResults') = 'object'
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Drop node_result table."""
+    op.drop_table('node_result')
@@ -0,0 +1,31 @@
+"""Add version to workflow
+
+Revision ID: 4d5e6f7a8b9c
+Revises: 3c4d5e6f7a8b
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d5e6f7a8b9c'
+down_revision: Union[str, Sequence[str], None] = '3c4d5e6f7a8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add version column to workflow table."""
+    op.add_column('workflow',
+        sa.Column('version', sa.Integer(), nullable=False,
+                  server_default=sa.text('1'))
+    )
+
+
+def downgrade() -> None:
+    """Remove version column from workflow table."""
+    op.drop_column('workflow', 'version')
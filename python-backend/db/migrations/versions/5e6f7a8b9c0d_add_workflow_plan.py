@@ -0,0 +1,31 @@
+"""Add compiled execution plan to workflow
+
+Revision ID: 5e6f7a8b9c0d
+Revises: 4d5e6f7a8b9c
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e6f7a8b9c0d'
+down_revision: Union[str, Sequence[str], None] = '4d5e6f7a8b9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add plan column to workflow table.
+
+    Existing workflows keep a NULL plan and are compiled when first read.
+    """
+    op.add_column('workflow', sa.Column('plan', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove plan column from workflow table."""
+    op.drop_column('workflow', 'plan')
@@ -61,6 +61,8 @@ class Workflow(SQLModel, table=True):
     trigger_type: TriggerType
     user_id: UUID = Field(foreign_key="user.id")
     webhook_id: Optional[UUID] = Field(foreign_key="webhook.id")
+    version: int = Field(default=1)
+    plan: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
 
     user: User = Relationship(back_populates="workflow")
     webhook: Optional[Webhook] = Relationship(back_populates="workflow")
@@ -88,3 +90,19 @@ class Execution(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     workflow: Workflow = Relationship(back_populates="execution")
+
+
+class NodeResult(SQLModel, table=True):
+    __tablename__ = "node_result"
+
+    execution_id: UUID = Field(
+        foreign_key="execution.id", primary_key=True, ondelete="CASCADE"
+    )
+    node_id: str = Field(primary_key=True)
+    node_type: Optional[str] = None
+    status: ExecutionStatus = Field(default=ExecutionStatus.COMPLETED)
+    started_at: Optional[datetime] = None
+    completed_at: datetime = Field(default_factory=datetime.utcnow)
+    duration_ms: Optional[int] = None
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
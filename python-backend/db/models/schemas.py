@@ -47,6 +47,10 @@ class ExecutionSchema(BaseModel):
     workflow_id: Optional[UUID] = None
 
 
+class DeadLetterSelection(BaseModel):
+    ids: Optional[List[str]] = None
+
+
 class PostmarkHeader(BaseModel):
     Name: str
     Value: str
@@ -1,15 +1,52 @@
 import os
 
-import redis
+import redis.asyncio as redis
 
 redis_password = os.getenv("REDIS_PASSWORD")
 use_ssl = redis_password is not None
 
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "localhost"),
-    port=int(os.getenv("REDIS_PORT", "6379")),
-    password=redis_password,
-    decode_responses=True,
-    ssl=use_ssl,
-    ssl_cert_reqs=None if use_ssl else "none",
-)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = int(os.getenv("REDIS_POOL_TIMEOUT", "20"))
+REDIS_STREAM_MAX_CONNECTIONS = int(os.getenv("REDIS_STREAM_MAX_CONNECTIONS", "100"))
+
+
+def create_redis_pool(
+    decode_responses: bool = True, max_connections: int = REDIS_MAX_CONNECTIONS
+) -> redis.BlockingConnectionPool:
+    # BlockingConnectionPool waits for a free connection instead of raising
+    # when every connection is checked out by a blocking command.
+    pool_options = {
+        "host": os.getenv("REDIS_HOST", "localhost"),
+        "port": int(os.getenv("REDIS_PORT", "6379")),
+        "password": redis_password,
+        "decode_responses": decode_responses,
+        "max_connections": max_connections,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "health_check_interval": 30,
+    }
+    if use_ssl:
+        pool_options["connection_class"] = redis.SSLConnection
+        pool_options["ssl_cert_reqs"] = None
+    return redis.BlockingConnectionPool(**pool_options)
+
+
+redis_pool = create_redis_pool()
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# Job envelopes and context blobs are binary, so the queue reads raw bytes.
+redis_bytes_pool = create_redis_pool(decode_responses=False)
+redis_bytes_client = redis.Redis(connection_pool=redis_bytes_pool)
+
+# Live execution streams hold a connection per viewer in XREAD BLOCK, so they
+# get their own pool and cannot starve the API's other Redis calls.
+redis_stream_pool = create_redis_pool(max_connections=REDIS_STREAM_MAX_CONNECTIONS)
+redis_stream_client = redis.Redis(connection_pool=redis_stream_pool)
+
+
+async def close_redis():
+    await redis_client.aclose()
+    await redis_bytes_client.aclose()
+    await redis_stream_client.aclose()
+    await redis_pool.disconnect()
+    await redis_bytes_pool.disconnect()
+    await redis_stream_pool.disconnect()
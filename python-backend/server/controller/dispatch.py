@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session
+
+from server.controller.progress import pause_execution, update_execution
+from server.redis.context import storeContext
+from server.redis.index import addManyToQueue
+from server.redis.join import arriveAtJoin
+
+# Nodes that do no I/O of their own. They run in the step that reaches them
+# instead of costing a queue round trip each: triggers pass their input on and
+# forms only pause the execution.
+INLINE_NODE_TYPES = {"webhook", "manual", "form"}
+
+
+def expected_branches(plan: Dict[str, Any], node_id: str, trigger: str) -> int:
+    if trigger == "webhook":
+        return plan["webhookPredecessors"].get(node_id, 0)
+    return plan["predecessors"].get(node_id, 0)
+
+
+async def run_inline(
+    plan: Dict[str, Any],
+    nodes: Dict[str, Any],
+    job_data: Dict[str, Any],
+    node_id: str,
+    context: Dict[str, Any],
+    db: Session,
+    next_jobs: List[Dict[str, Any]],
+):
+    node_type = plan["types"][node_id]
+    if node_type == "form":
+        pause_execution(db, job_data["executionId"], node_id)
+        return
+    started_at = datetime.utcnow()
+    node_result = context if node_type == "webhook" else {}
+    await update_execution(
+        job_data["executionId"], node_id, node_result, db, node_type, started_at
+    )
+    await collect_successors(
+        plan, nodes, job_data, node_id, {**context, **node_result}, db, next_jobs
+    )
+
+
+async def enter_node(
+    plan: Dict[str, Any],
+    nodes: Dict[str, Any],
+    job_data: Dict[str, Any],
+    node_id: str,
+    context: Dict[str, Any],
+    context_ref: Optional[str],
+    db: Session,
+    next_jobs: List[Dict[str, Any]],
+):
+    node_type = plan["types"][node_id]
+    if node_type in INLINE_NODE_TYPES:
+        await run_inline(plan, nodes, job_data, node_id, context, db, next_jobs)
+        return
+    node_data = nodes[node_id]
+    next_jobs.append(
+        {
+            "id": f"{node_id}-{job_data['executionId']}",
+            "type": node_type,
+            "data": {
+                **job_data,
+                "trigger": job_data.get("trigger", "manual"),
+                "nodeId": node_id,
+                "nodeData": node_data,
+                "credentialId": node_data.get("credentials"),
+                "contextRef": context_ref or await storeContext(context),
+                "context": {},
+                "connections": plan["successors"][node_id],
+                "attempt": 1,
+            },
+        }
+    )
+    print(f"Adding {node_type} job to queue for node {node_id}")
+
+
+async def collect_successors(
+    plan: Dict[str, Any],
+    nodes: Dict[str, Any],
+    job_data: Dict[str, Any],
+    node_id: str,
+    context: Dict[str, Any],
+    db: Session,
+    next_jobs: List[Dict[str, Any]],
+):
+    successors = plan["successors"].get(node_id, [])
+    if not successors:
+        return
+    # Stored once for all successors; identical contexts share one blob.
+    context_ref = await storeContext(context)
+    trigger = job_data.get("trigger", "manual")
+    for next_node_id in successors:
+        next_context, next_ref = context, context_ref
+        expected = expected_branches(plan, next_node_id, trigger)
+        if expected > 1:
+            branches = await arriveAtJoin(
+                job_data["executionId"], next_node_id, node_id, context, expected
+            )
+            if branches is None:
+                print(f"Join {next_node_id} is waiting for other branches")
+                continue
+            next_context, next_ref = {}, None
+            for predecessor_id in plan["order"]:
+                if predecessor_id in branches:
+                    next_context.update(branches[predecessor_id])
+        await enter_node(
+            plan, nodes, job_data, next_node_id, next_context, next_ref, db, next_jobs
+        )
+
+
+async def dispatch_successors(
+    plan: Dict[str, Any],
+    nodes: Dict[str, Any],
+    job_data: Dict[str, Any],
+    node_id: str,
+    context: Dict[str, Any],
+    db: Session,
+) -> List[Dict[str, Any]]:
+    """Enqueue the nodes that follow node_id, given the context it produced.
+
+    A node with several incoming branches is enqueued once, by whichever
+    branch finishes last, with the contexts of all branches merged in plan
+    order. Trivial nodes are run on the spot and their successors followed.
+    """
+    next_jobs: List[Dict[str, Any]] = []
+    await collect_successors(plan, nodes, job_data, node_id, context, db, next_jobs)
+    await addManyToQueue(next_jobs)
+    return next_jobs
+
+
+async def dispatch_start_nodes(
+    plan: Dict[str, Any],
+    nodes: Dict[str, Any],
+    job_data: Dict[str, Any],
+    node_ids: List[str],
+    context: Dict[str, Any],
+    db: Session,
+) -> List[Dict[str, Any]]:
+    next_jobs: List[Dict[str, Any]] = []
+    context_ref = None
+    for node_id in node_ids:
+        if plan["types"][node_id] not in INLINE_NODE_TYPES:
+            context_ref = context_ref or await storeContext(context)
+        await enter_node(
+            plan, nodes, job_data, node_id, context, context_ref, db, next_jobs
+        )
+    await addManyToQueue(next_jobs)
+    return next_jobs
@@ -0,0 +1,105 @@
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+# Bump when the shape of a compiled plan changes; older plans are recompiled.
+PLAN_FORMAT = 2
+
+
+def node_type_of(node: Dict[str, Any]) -> str:
+    return (node.get("type") or (node.get("data") or {}).get("nodeType") or "").lower()
+
+
+def is_recorded(node: Dict[str, Any], node_type: str) -> bool:
+    # Forms and emails that wait for a reply pause the execution instead of
+    # completing, so they never count towards tasks_done.
+    if node_type == "form":
+        return False
+    config = (node.get("data") or {}).get("config") or {}
+    return not (node_type == "email" and (config.get("template") or {}).get("waitForReply"))
+
+
+def reachable_from(start_nodes: List[str], successors: Dict[str, List[str]]) -> List[str]:
+    seen = set(start_nodes)
+    pending = deque(start_nodes)
+    while pending:
+        for next_node_id in successors[pending.popleft()]:
+            if next_node_id not in seen:
+                seen.add(next_node_id)
+                pending.append(next_node_id)
+    return list(seen)
+
+
+def compile_plan(nodes: Dict[str, Any], connections: Dict[str, Any]) -> Dict[str, Any]:
+    nodes = nodes or {}
+    connections = connections or {}
+    successors: Dict[str, List[str]] = {
+        node_id: list(
+            dict.fromkeys(
+                next_node_id
+                for next_node_id in connections.get(node_id) or []
+                if next_node_id in nodes
+            )
+        )
+        for node_id in nodes
+    }
+    predecessors = {node_id: 0 for node_id in nodes}
+    for next_node_ids in successors.values():
+        for next_node_id in next_node_ids:
+            predecessors[next_node_id] += 1
+
+    # Kahn's algorithm; nodes left over sit on a cycle.
+    remaining = dict(predecessors)
+    start_nodes = [node_id for node_id, count in predecessors.items() if count == 0]
+    ready = deque(start_nodes)
+    order: List[str] = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for next_node_id in successors[node_id]:
+            remaining[next_node_id] -= 1
+            if remaining[next_node_id] == 0:
+                ready.append(next_node_id)
+    if len(order) < len(nodes):
+        cyclic = sorted(node_id for node_id in nodes if remaining[node_id] > 0)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Workflow contains a cycle through nodes: {', '.join(cyclic)}",
+        )
+
+    types = {node_id: node_type_of(node) for node_id, node in nodes.items()}
+    recorded = {
+        node_id for node_id, node in nodes.items() if is_recorded(node, types[node_id])
+    }
+    trigger_node: Optional[str] = next(
+        (node_id for node_id in order if types[node_id] == "webhook"), None
+    )
+    # A webhook run only reaches the nodes downstream of its trigger, so joins
+    # wait for fewer branches than in a manual run.
+    webhook_nodes = (
+        set(reachable_from([trigger_node], successors)) if trigger_node else set()
+    )
+    webhook_predecessors = {node_id: 0 for node_id in webhook_nodes}
+    for node_id in webhook_nodes:
+        for next_node_id in successors[node_id]:
+            webhook_predecessors[next_node_id] += 1
+    return {
+        "format": PLAN_FORMAT,
+        "order": order,
+        "startNodes": start_nodes,
+        "triggerNode": trigger_node,
+        "types": types,
+        "successors": successors,
+        "predecessors": predecessors,
+        "webhookPredecessors": webhook_predecessors,
+        "totalTasks": len(recorded),
+        "webhookTasks": len(webhook_nodes & recorded),
+    }
+
+
+def get_plan(workflow: Any) -> Dict[str, Any]:
+    plan = workflow.plan
+    if plan and plan.get("format") == PLAN_FORMAT:
+        return plan
+    return compile_plan(workflow.nodes, workflow.connections)
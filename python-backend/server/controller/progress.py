@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+
+from db.models.models import Execution, ExecutionStatus, NodeResult
+from server.redis.join import clearJoins
+
+# Node outputs are rows in node_result, so completing a node costs one small
+# insert plus this counter update, whatever the size of the execution. The
+# counter and the status change in a single statement, so workers finishing
+# sibling nodes at the same time cannot lose updates.
+UPDATE_PROGRESS_SQL = text(
+    """
+    UPDATE execution
+    SET tasks_done = tasks_done + 1,
+        status = CASE
+            WHEN tasks_done + 1 >= COALESCE(total_tasks, 0) THEN 'COMPLETED'
+            ELSE status
+        END,
+        result = CASE
+            WHEN tasks_done + 1 >= COALESCE(total_tasks, 0)
+            THEN (
+                COALESCE(result::jsonb, '{}'::jsonb)
+                || jsonb_build_object('completedAt', CAST(:now AS double precision))
+            )::json
+            ELSE result
+        END
+    WHERE id = CAST(:execution_id AS uuid)
+    RETURNING tasks_done, total_tasks
+    """
+)
+
+
+def record_node_result(
+    db: Session,
+    execution_id: str,
+    node_id: str,
+    node_type: Optional[str],
+    status: ExecutionStatus,
+    started_at: Optional[datetime] = None,
+    result: Any = None,
+    error: Optional[str] = None,
+) -> bool:
+    """Upsert the node's row; False if the node had already completed."""
+    completed_at = datetime.utcnow()
+    values = {
+        "node_type": node_type,
+        "status": status,
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "duration_ms": (
+            int((completed_at - started_at).total_seconds() * 1000)
+            if started_at
+            else None
+        ),
+        "result": result,
+        "error": error,
+    }
+    # A retried or requeued node overwrites its previous row, unless that
+    # row already records a completion: a redelivered job that runs again
+    # must neither replace the result nor count towards tasks_done twice.
+    statement = (
+        insert(NodeResult)
+        .values(execution_id=UUID(str(execution_id)), node_id=node_id, **values)
+        .on_conflict_do_update(
+            index_elements=["execution_id", "node_id"],
+            set_=values,
+            where=NodeResult.__table__.c.status != ExecutionStatus.COMPLETED,
+        )
+        .returning(NodeResult.__table__.c.node_id)
+    )
+    return db.execute(statement).first() is not None
+
+
+async def update_execution(
+    execution_id: str,
+    node_id: str,
+    node_result: Any,
+    db: Session,
+    node_type: Optional[str] = None,
+    started_at: Optional[datetime] = None,
+):
+    newly_completed = record_node_result(
+        db,
+        execution_id,
+        node_id,
+        node_type,
+        ExecutionStatus.COMPLETED,
+        started_at,
+        node_result,
+    )
+    if not newly_completed:
+        db.commit()
+        print(f"Node {node_id} of execution {execution_id} had already completed")
+        return
+    row = db.execute(
+        UPDATE_PROGRESS_SQL,
+        {"execution_id": str(execution_id), "now": asyncio.get_event_loop().time()},
+    ).first()
+    db.commit()
+    if not row:
+        return
+    print(f"Execution completed: {execution_id}, {row.tasks_done}, {row.total_tasks}")
+    if row.tasks_done >= (row.total_tasks or 0):
+        await clearJoins(execution_id)
+
+
+def pause_execution(db: Session, execution_id: str, node_id: str):
+    execution = db.get(Execution, execution_id)
+    if not execution:
+        return
+    execution.status = ExecutionStatus.PAUSED
+    execution.paused_node_id = node_id
+    db.add(execution)
+    db.commit()
+    print(f"Execution {execution.id} paused at node {node_id}")
@@ -6,8 +6,8 @@ from fastapi import HTTPException
 from sqlmodel import Session, select
 
 from db.models.models import Execution, ExecutionStatus, Workflow
-from exports.redis import redis_client
-from server.redis.index import addToQueue
+from server.controller.dispatch import dispatch_start_nodes
+from server.controller.plan import get_plan
 
 
 async def handle_webhook_call(
@@ -21,25 +21,18 @@ async def handle_webhook_call(
                 status_code=404, detail="No workflow found for the Id provided"
             )
         nodes = workflow.nodes or {}
-        connections = workflow.connections or {}
-        trigger_node_id = None
-        for node_id, node_data in nodes.items():
-            if node_data.get("type") == "webhook":
-                trigger_node_id = node_id
-                break
+        plan = get_plan(workflow)
+        trigger_node_id = plan["triggerNode"]
         if not trigger_node_id:
             raise HTTPException(status_code=500, detail="Workflow has not webhook id")
 
-        has_form_node = any(
-            node_data.get("type") == "form"
-            or node_data.get("data", {}).get("nodeType") == "form"
-            for node_data in nodes.values()
-        )
+        has_form_node = "form" in plan["types"].values()
 
         new_execution = Execution(
             workflow_id=workflow.id,
             status=ExecutionStatus.PENDING,
-            total_tasks=len(nodes),
+            total_tasks=plan["webhookTasks"],
+            result={"trigger": "webhook"},
         )
         db.add(new_execution)
         db.commit()
@@ -53,19 +46,21 @@ async def handle_webhook_call(
             "body": body_data,
             "query_params": query_params,
         }
-        initial_job = {
-            "id": f"{trigger_node_id}-{new_execution.id}",
-            "type": "webhook",
-            "data": {
+        # The trigger only passes the request on, so it is recorded here and
+        # the first real node is queued straight away.
+        await dispatch_start_nodes(
+            plan,
+            nodes,
+            {
                 "executionId": str(new_execution.id),
                 "workflowId": str(workflow.id),
-                "nodeId": trigger_node_id,
-                "nodeData": nodes[trigger_node_id],
-                "context": webhook_data,
-                "connections": connections.get(trigger_node_id, []),
+                "workflowVersion": workflow.version,
+                "trigger": "webhook",
             },
-        }
-        await addToQueue(initial_job)
+            [trigger_node_id],
+            webhook_data,
+            db,
+        )
 
         return {
             "execution_id": str(new_execution.id),
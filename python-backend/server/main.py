@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -8,6 +9,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from db.database import create_tables
+from exports.redis import close_redis
+from server.redis.index import QUEUE_BACKEND, releaseWorker
 from server.routes.credentials import router as credentials_router
 from server.routes.executions import router as execution_router
 from server.routes.nodes import router as nodes_router
@@ -21,7 +24,19 @@ from server.routes.workflow import router as workflow_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_tables()
+    worker_task = None
+    worker_stop = asyncio.Event()
+    if QUEUE_BACKEND == "memory":
+        # With the in-process queue the API runs the worker loop itself.
+        from Workers.index import process_jobs
+
+        worker_task = asyncio.create_task(process_jobs(worker_stop))
     yield
+    if worker_task:
+        worker_stop.set()
+        await asyncio.gather(worker_task, return_exceptions=True)
+        await releaseWorker()
+    await close_redis()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional, Protocol
+
+
+class QueueBackend(Protocol):
+    """Transport for workflow jobs shared by the API and the worker.
+
+    Jobs are plain dicts of the form {"id", "type", "data"}. A backend may add
+    a "receipt" key to popped jobs, which it needs back in ack().
+    """
+
+    name: str
+
+    async def push(self, jobs_data: List[Dict[str, Any]]) -> None: ...
+
+    async def pop(self, timeout: int, count: int = 1) -> Optional[Dict[str, Any]]:
+        """Next job, or None after timeout seconds.
+
+        count is how many jobs the caller could start right now; a backend
+        that fetches in batches reads no more than that.
+        """
+        ...
+
+    async def ack(self, job: Dict[str, Any]) -> None: ...
+
+    async def nack(self, job: Dict[str, Any]) -> None:
+        """Hand a popped job back to the queue for redelivery."""
+        ...
+
+    async def schedule(self, job_data: Dict[str, Any], delay_seconds: float) -> None: ...
+
+    async def promote_due(self) -> int: ...
+
+    async def maintain(self) -> None: ...
+
+    async def release(self) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+def create_queue_backend(
+    name: str,
+    worker_id: str,
+    visibility_timeout: int,
+    reliable: bool,
+    node_type: Optional[str] = None,
+) -> QueueBackend:
+    """node_type selects a dedicated queue for that type instead of the shared one."""
+    if name == "memory":
+        from server.queue.in_process import InProcessBackend
+
+        return InProcessBackend()
+    if name == "streams":
+        from server.queue.redis_streams import RedisStreamsBackend
+
+        return RedisStreamsBackend(worker_id, visibility_timeout, node_type)
+    if name != "list":
+        raise ValueError(f"Unknown QUEUE_BACKEND: {name}")
+    from server.queue.redis_list import RedisListBackend
+
+    return RedisListBackend(worker_id, visibility_timeout, reliable, node_type)
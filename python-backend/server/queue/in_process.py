@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+
+class InProcessBackend:
+    """An asyncio.Queue for running the API and the worker in one process.
+
+    Jobs are handed over as the same dict objects, without serialization or a
+    network hop. Nothing survives a restart, so this is meant for single-node
+    deployments, local development, tests and benchmarks.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._timers: Set[asyncio.TimerHandle] = set()
+
+    async def push(self, jobs_data: List[Dict[str, Any]]) -> None:
+        for job_data in jobs_data:
+            self._queue.put_nowait(job_data)
+
+    async def pop(self, timeout: int, count: int = 1) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout or None)
+        except asyncio.TimeoutError:
+            return None
+
+    async def ack(self, job: Dict[str, Any]) -> None:
+        return
+
+    async def nack(self, job: Dict[str, Any]) -> None:
+        self._queue.put_nowait(job)
+
+    async def schedule(self, job_data: Dict[str, Any], delay_seconds: float) -> None:
+        def _enqueue():
+            self._timers.discard(timer)
+            self._queue.put_nowait(job_data)
+
+        timer = asyncio.get_running_loop().call_later(delay_seconds, _enqueue)
+        self._timers.add(timer)
+
+    async def promote_due(self) -> int:
+        # Timers enqueue delayed jobs themselves.
+        return 0
+
+    async def maintain(self) -> None:
+        return
+
+    async def release(self) -> None:
+        return
+
+    async def clear(self) -> None:
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+        while not self._queue.empty():
+            self._queue.get_nowait()
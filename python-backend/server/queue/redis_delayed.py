@@ -0,0 +1,48 @@
+import os
+import time
+from typing import Any, Dict
+
+from exports.redis import redis_bytes_client
+from server.redis.codec import encode
+
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "100"))
+
+# Moves due jobs onto the ready queue in one step, so a crash or a failed
+# round trip cannot drop a job between claiming and pushing it. Every worker
+# runs the scheduler; the script running atomically decides who moves what.
+# Members are already encoded envelopes and are pushed unchanged.
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, member in ipairs(due) do
+    redis.call('ZREM', KEYS[1], member)
+    if ARGV[3] == 'stream' then
+        redis.call('XADD', KEYS[2], '*', 'job', member)
+    else
+        redis.call('LPUSH', KEYS[2], member)
+    end
+end
+return #due
+"""
+promote_script = redis_bytes_client.register_script(PROMOTE_SCRIPT)
+
+
+class RedisDelayedJobs:
+    """Delayed jobs in a sorted set scored by due time, shared by Redis backends.
+
+    Backends set delayed_key, plus ready_key and ready_kind ("list" or
+    "stream") for where due jobs are pushed.
+    """
+
+    delayed_key: str
+    ready_key: str
+    ready_kind: str
+
+    async def schedule(self, job_data: Dict[str, Any], delay_seconds: float) -> None:
+        due_at = time.time() + delay_seconds
+        await redis_bytes_client.zadd(self.delayed_key, {encode(job_data): due_at})
+
+    async def promote_due(self) -> int:
+        return await promote_script(
+            keys=[self.delayed_key, self.ready_key],
+            args=[repr(time.time()), SCHEDULER_BATCH_SIZE, self.ready_kind],
+        )
@@ -0,0 +1,146 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from exports.redis import redis_bytes_client, redis_client
+from server.queue.redis_delayed import RedisDelayedJobs
+from server.redis.codec import decode, encode
+from server.redis.dead_letter import addToDeadLetter
+
+QUEUE_NAME = "workflow-queue"
+
+# Moves every job held by a worker back onto the main queue, unless the
+# worker heartbeated again after the caller decided it was dead.
+RECLAIM_SCRIPT = """
+local seen = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if seen and tonumber(seen) > tonumber(ARGV[2]) then
+    return -1
+end
+local moved = 0
+while redis.call('LMOVE', KEYS[2], KEYS[3], 'LEFT', 'RIGHT') do
+    moved = moved + 1
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+return moved
+"""
+reclaim_script = redis_bytes_client.register_script(RECLAIM_SCRIPT)
+
+
+class RedisListBackend(RedisDelayedJobs):
+    """The workflow-queue LIST; with reliable=True jobs are BLMOVEd into a
+    per-worker processing list and only removed from it on ack."""
+
+    name = "list"
+
+    def __init__(
+        self,
+        worker_id: str,
+        visibility_timeout: int,
+        reliable: bool,
+        node_type: Optional[str] = None,
+    ):
+        self.worker_id = worker_id
+        self.visibility_timeout = visibility_timeout
+        self.reliable = reliable
+        self.queue = f"{QUEUE_NAME}:{node_type}" if node_type else QUEUE_NAME
+        self.workers_key = f"{self.queue}:workers"
+        self.delayed_key = f"{self.queue}:delayed"
+        self.ready_key = self.queue
+        self.ready_kind = "list"
+
+    def processing_queue(self, worker_id: str) -> str:
+        return f"{self.queue}:processing:{worker_id}"
+
+    async def push(self, jobs_data: List[Dict[str, Any]]) -> None:
+        # A single variadic LPUSH keeps the same FIFO order as pushing one by one.
+        await redis_bytes_client.lpush(self.queue, *[encode(job) for job in jobs_data])
+
+    async def _decode_or_dead_letter(self, raw: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            return decode(raw)
+        except Exception as error:
+            await addToDeadLetter(raw, f"Undecodable job: {error}")
+            return None
+
+    async def pop(self, timeout: int, count: int = 1) -> Optional[Dict[str, Any]]:
+        if not self.reliable:
+            res = await redis_bytes_client.brpop(self.queue, timeout)
+            if res:
+                return await self._decode_or_dead_letter(res[1])
+            return None
+        processing = self.processing_queue(self.worker_id)
+        raw = await redis_bytes_client.blmove(
+            self.queue, processing, timeout, "RIGHT", "LEFT"
+        )
+        if raw is None:
+            return None
+        job = await self._decode_or_dead_letter(raw)
+        if job is None:
+            await redis_bytes_client.lrem(processing, 1, raw)
+            return None
+        job["receipt"] = raw
+        return job
+
+    async def ack(self, job: Dict[str, Any]) -> None:
+        await redis_bytes_client.lrem(
+            self.processing_queue(self.worker_id), 1, job["receipt"]
+        )
+
+    async def nack(self, job: Dict[str, Any]) -> None:
+        if not self.reliable:
+            # Already gone from Redis, so it is pushed again.
+            await redis_bytes_client.rpush(
+                self.queue,
+                encode({key: value for key, value in job.items() if key != "receipt"}),
+            )
+            return
+        # Back onto the end that is popped next.
+        async with redis_bytes_client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_queue(self.worker_id), 1, job["receipt"])
+            pipe.rpush(self.queue, job["receipt"])
+            await pipe.execute()
+
+    async def heartbeat(self) -> None:
+        await redis_client.zadd(self.workers_key, {self.worker_id: time.time()})
+
+    async def reclaim_expired(self) -> int:
+        cutoff = time.time() - self.visibility_timeout
+        expired_workers = await redis_client.zrangebyscore(
+            self.workers_key, "-inf", cutoff
+        )
+        reclaimed = 0
+        for worker_id in expired_workers:
+            moved = await reclaim_script(
+                keys=[
+                    self.workers_key,
+                    self.processing_queue(worker_id),
+                    self.queue,
+                ],
+                args=[worker_id, cutoff],
+            )
+            if moved > 0:
+                print(f"Reclaimed {moved} job(s) from expired worker {worker_id}")
+                reclaimed += moved
+        return reclaimed
+
+    async def maintain(self) -> None:
+        if not self.reliable:
+            return
+        await self.heartbeat()
+        await self.reclaim_expired()
+
+    async def release(self) -> None:
+        if not self.reliable:
+            return
+        # A cleanly stopping worker hands back anything it still holds right
+        # away instead of waiting for the visibility timeout.
+        await reclaim_script(
+            keys=[
+                self.workers_key,
+                self.processing_queue(self.worker_id),
+                self.queue,
+            ],
+            args=[self.worker_id, time.time() + self.visibility_timeout],
+        )
+
+    async def clear(self) -> None:
+        await redis_client.delete(self.queue, self.delayed_key)
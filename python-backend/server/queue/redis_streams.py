@@ -0,0 +1,203 @@
+import os
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from redis.exceptions import ResponseError
+
+from exports.redis import redis_bytes_client as redis_client
+from server.queue.redis_delayed import RedisDelayedJobs
+from server.redis.codec import decode, encode
+from server.redis.dead_letter import addToDeadLetter
+
+STREAM_NAME = "workflow-stream"
+CONSUMER_GROUP = os.getenv("QUEUE_CONSUMER_GROUP", "workflow-workers")
+STREAM_BATCH_SIZE = int(os.getenv("QUEUE_BATCH_SIZE", "10"))
+
+
+class RedisStreamsBackend(RedisDelayedJobs):
+    """A consumer group on workflow-stream, read several entries at a time.
+
+    Unacked entries stay in the group's pending list, so XPENDING shows what
+    each worker holds and XAUTOCLAIM recovers them after the visibility timeout.
+    A read takes no more entries than the caller has free slots for (and at
+    most STREAM_BATCH_SIZE), so a busy worker leaves the rest to idle ones.
+    """
+
+    name = "streams"
+
+    def __init__(
+        self, worker_id: str, visibility_timeout: int, node_type: Optional[str] = None
+    ):
+        self.consumer = worker_id
+        self.stream = f"{STREAM_NAME}:{node_type}" if node_type else STREAM_NAME
+        # The shared stream keeps the delayed set it used before per-type queues.
+        self.delayed_key = (
+            f"{self.stream}:delayed" if node_type else "workflow-queue:delayed"
+        )
+        self.ready_key = self.stream
+        self.ready_kind = "stream"
+        self.visibility_timeout = visibility_timeout
+        # Entries fetched in one round trip but not yet handed out.
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        # Entry ids handed out and not yet acked; only these are renewed.
+        self._held: Set[str] = set()
+        self._group_ready = False
+        # Set by maintain() when entries have sat idle past the visibility
+        # timeout; pop() then claims them a batch at a time from the cursor.
+        self._stale = False
+        self._claim_cursor = "0-0"
+
+    def _to_job(self, entry_id: bytes, fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+        job = decode(fields[b"job"])
+        job["receipt"] = entry_id.decode()
+        return job
+
+    async def _buffer_entries(self, entries: List[Any]) -> int:
+        added = 0
+        buffered = {job["receipt"] for job in self._buffer}
+        for entry_id, fields in entries:
+            receipt = entry_id.decode()
+            # Deleted entries come back without fields, and claims can return
+            # entries we already have.
+            if not fields or receipt in self._held or receipt in buffered:
+                continue
+            try:
+                self._buffer.append(self._to_job(entry_id, fields))
+                added += 1
+            except Exception as error:
+                await addToDeadLetter(
+                    fields.get(b"job", b""), f"Undecodable job: {error}"
+                )
+                await self.ack({"receipt": receipt})
+        return added
+
+    async def _claim_stale(self, count: int) -> None:
+        res = await redis_client.xautoclaim(
+            self.stream,
+            CONSUMER_GROUP,
+            self.consumer,
+            min_idle_time=self.visibility_timeout * 1000,
+            start_id=self._claim_cursor,
+            count=count,
+        )
+        self._claim_cursor = res[0].decode()
+        # Back at the start once the whole pending list has been scanned.
+        if self._claim_cursor == "0-0":
+            self._stale = False
+        claimed = await self._buffer_entries(res[1])
+        if claimed:
+            print(f"Claimed {claimed} stale job(s) from {self.stream}")
+
+    async def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            # Start from 0 so jobs added before the first worker ever ran are delivered.
+            await redis_client.xgroup_create(
+                self.stream, CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+        self._group_ready = True
+
+    async def push(self, jobs_data: List[Dict[str, Any]]) -> None:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for job_data in jobs_data:
+                pipe.xadd(self.stream, {"job": encode(job_data)})
+            await pipe.execute()
+
+    async def pop(self, timeout: int, count: int = 1) -> Optional[Dict[str, Any]]:
+        count = max(1, min(count, STREAM_BATCH_SIZE))
+        if not self._buffer:
+            await self._ensure_group()
+            if self._stale:
+                await self._claim_stale(count)
+        if not self._buffer:
+            res = await redis_client.xreadgroup(
+                CONSUMER_GROUP,
+                self.consumer,
+                {self.stream: ">"},
+                count=count,
+                block=timeout * 1000,
+            )
+            for _, entries in res or []:
+                await self._buffer_entries(entries)
+        if not self._buffer:
+            return None
+        job = self._buffer.popleft()
+        self._held.add(job["receipt"])
+        return job
+
+    async def ack(self, job: Dict[str, Any]) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.xack(self.stream, CONSUMER_GROUP, job["receipt"])
+            pipe.xdel(self.stream, job["receipt"])
+            await pipe.execute()
+        self._held.discard(job["receipt"])
+
+    async def renew(self) -> None:
+        # Resets the idle time of entries handed out and still running, so a
+        # job running for longer than the visibility timeout is not claimed by
+        # another worker. Buffered entries are left to go stale.
+        if not self._held:
+            return
+        await redis_client.xclaim(
+            self.stream,
+            CONSUMER_GROUP,
+            self.consumer,
+            min_idle_time=0,
+            message_ids=list(self._held),
+            justid=True,
+        )
+
+    async def maintain(self) -> None:
+        await self._ensure_group()
+        await self.renew()
+        # Only looks; stale entries are claimed by pop() as slots free up, so
+        # a busy worker does not take them from idle ones.
+        if not self._stale:
+            stale = await redis_client.xpending_range(
+                self.stream,
+                CONSUMER_GROUP,
+                min="-",
+                max="+",
+                count=1,
+                idle=self.visibility_timeout * 1000,
+            )
+            self._stale = bool(stale)
+
+    async def _return_entries(self, jobs: List[Dict[str, Any]]) -> None:
+        # Re-added as new entries, so any consumer can read them right away.
+        for job in jobs:
+            self._held.discard(job["receipt"])
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for job in jobs:
+                job_data = {key: value for key, value in job.items() if key != "receipt"}
+                pipe.xadd(self.stream, {"job": encode(job_data)})
+                pipe.xack(self.stream, CONSUMER_GROUP, job["receipt"])
+                pipe.xdel(self.stream, job["receipt"])
+            await pipe.execute()
+
+    async def nack(self, job: Dict[str, Any]) -> None:
+        # No longer renewed, so if this fails XAUTOCLAIM picks the entry up.
+        await self._return_entries([job])
+
+    async def release(self) -> None:
+        # Prefetched entries that never started go back to the stream, so other
+        # consumers get them now instead of after the visibility timeout.
+        # Entries of running jobs stay pending and are reclaimed as before.
+        if not self._buffer:
+            return
+        jobs = list(self._buffer)
+        self._buffer.clear()
+        await self._return_entries(jobs)
+        print(f"Returned {len(jobs)} prefetched job(s) to {self.stream}")
+
+    async def clear(self) -> None:
+        await redis_client.delete(self.stream, self.delayed_key)
+        self._buffer.clear()
+        self._held.clear()
+        self._group_ready = False
+        self._stale = False
+        self._claim_cursor = "0-0"
@@ -0,0 +1,141 @@
+import json
+import os
+import zlib
+from typing import Any, Callable, Dict
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Envelope layout: MAGIC | version | codec id | compression id | payload.
+# Legacy jobs are bare JSON text and always start with "{", never with MAGIC.
+MAGIC = b"N8"
+ENVELOPE_VERSION = 1
+
+CODEC_JSON = 0
+CODEC_ORJSON = 1
+CODEC_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+QUEUE_CODEC = os.getenv("QUEUE_CODEC", "orjson").lower()
+QUEUE_COMPRESSION = os.getenv("QUEUE_COMPRESSION", "zlib").lower()
+QUEUE_COMPRESSION_THRESHOLD = int(os.getenv("QUEUE_COMPRESSION_THRESHOLD", "4096"))
+
+
+def _orjson_dumps(value: Any, sort_keys: bool) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(value, default=str, option=option)
+
+
+def _json_dumps(value: Any, sort_keys: bool) -> bytes:
+    return json.dumps(
+        value, sort_keys=sort_keys, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _msgpack_dumps(value: Any, sort_keys: bool) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=str)
+
+
+def _msgpack_loads(payload: bytes) -> Any:
+    return msgpack.unpackb(payload, raw=False)
+
+
+ENCODERS: Dict[int, Callable[[Any, bool], bytes]] = {
+    CODEC_JSON: _json_dumps,
+    CODEC_ORJSON: _orjson_dumps,
+    CODEC_MSGPACK: _msgpack_dumps,
+}
+DECODERS: Dict[int, Callable[[bytes], Any]] = {
+    CODEC_JSON: json.loads,
+    CODEC_ORJSON: orjson.loads,
+    CODEC_MSGPACK: _msgpack_loads,
+}
+
+
+def _zstd_compress(payload: bytes) -> bytes:
+    return zstandard.ZstdCompressor().compress(payload)
+
+
+def _zstd_decompress(payload: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(payload)
+
+
+COMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {
+    COMPRESSION_ZLIB: zlib.compress,
+    COMPRESSION_ZSTD: _zstd_compress,
+}
+DECOMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {
+    COMPRESSION_ZLIB: zlib.decompress,
+    COMPRESSION_ZSTD: _zstd_decompress,
+}
+
+
+def _select_codec() -> int:
+    codecs = {"json": CODEC_JSON, "orjson": CODEC_ORJSON, "msgpack": CODEC_MSGPACK}
+    codec = codecs.get(QUEUE_CODEC, CODEC_ORJSON)
+    if codec == CODEC_MSGPACK and msgpack is None:
+        print("QUEUE_CODEC=msgpack but msgpack is not installed, using orjson")
+        return CODEC_ORJSON
+    return codec
+
+
+def _select_compression() -> int:
+    compressions = {
+        "none": COMPRESSION_NONE,
+        "zlib": COMPRESSION_ZLIB,
+        "zstd": COMPRESSION_ZSTD,
+    }
+    compression = compressions.get(QUEUE_COMPRESSION, COMPRESSION_ZLIB)
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        print("QUEUE_COMPRESSION=zstd but zstandard is not installed, using zlib")
+        return COMPRESSION_ZLIB
+    return compression
+
+
+ACTIVE_CODEC = _select_codec()
+ACTIVE_COMPRESSION = _select_compression()
+
+
+def encode(value: Any, sort_keys: bool = False) -> bytes:
+    payload = ENCODERS[ACTIVE_CODEC](value, sort_keys)
+    compression = COMPRESSION_NONE
+    if (
+        ACTIVE_COMPRESSION != COMPRESSION_NONE
+        and len(payload) >= QUEUE_COMPRESSION_THRESHOLD
+    ):
+        payload = COMPRESSORS[ACTIVE_COMPRESSION](payload)
+        compression = ACTIVE_COMPRESSION
+    return MAGIC + bytes((ENVELOPE_VERSION, ACTIVE_CODEC, compression)) + payload
+
+
+def decode(raw: Any) -> Any:
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if not raw.startswith(MAGIC):
+        # Plain JSON written before the envelope existed.
+        return json.loads(raw)
+    version, codec, compression = raw[2], raw[3], raw[4]
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"Unsupported job envelope version: {version}")
+    payload = raw[5:]
+    if compression != COMPRESSION_NONE:
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            raise ValueError("Job is zstd-compressed but zstandard is not installed")
+        payload = DECOMPRESSORS[compression](payload)
+    if codec == CODEC_MSGPACK and msgpack is None:
+        raise ValueError("Job is msgpack-encoded but msgpack is not installed")
+    return DECODERS[codec](payload)
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from exports.redis import redis_bytes_client as redis_client
+from server.redis.codec import decode, encode
+from server.redis.index import QUEUE_BACKEND
+
+CONTEXT_PREFIX = "workflow-context"
+CONTEXT_TTL = int(os.getenv("CONTEXT_TTL", "86400"))
+CONTEXT_CACHE_SIZE = int(os.getenv("CONTEXT_CACHE_SIZE", "256"))
+CONTEXT_LOCAL_SIZE = int(os.getenv("CONTEXT_LOCAL_SIZE", "10000"))
+
+# Contexts are immutable once stored (the key is their hash), so a local copy
+# never goes stale and can be reused for every job that references it.
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# With the in-process queue the producer and the consumer share memory, so
+# contexts are kept here by reference (expiring after CONTEXT_TTL) instead of
+# being encoded into Redis. Every hop stores one, so the oldest are also
+# dropped beyond CONTEXT_LOCAL_SIZE to bound memory; size it above the number
+# of jobs that can be queued or running at once.
+_local_blobs: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _key(ref: str) -> str:
+    return f"{CONTEXT_PREFIX}:{ref}"
+
+
+def _remember(ref: str, context: Dict[str, Any]):
+    _cache[ref] = context
+    _cache.move_to_end(ref)
+    while len(_cache) > CONTEXT_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _storeLocal(context: Dict[str, Any]) -> str:
+    now = time.time()
+    # Every blob gets the same TTL, so the oldest entries expire first.
+    while _local_blobs and next(iter(_local_blobs.values()))[0] < now:
+        _local_blobs.popitem(last=False)
+    ref = uuid.uuid4().hex
+    _local_blobs[ref] = (now + CONTEXT_TTL, context)
+    while len(_local_blobs) > CONTEXT_LOCAL_SIZE:
+        _local_blobs.popitem(last=False)
+    return ref
+
+
+async def storeContext(context: Dict[str, Any]) -> str:
+    if QUEUE_BACKEND == "memory":
+        return _storeLocal(context)
+    payload = encode(context, sort_keys=True)
+    ref = hashlib.sha256(payload).hexdigest()
+    # A blob we wrote before only needs its TTL refreshed, unless it expired.
+    if ref in _cache and await redis_client.expire(_key(ref), CONTEXT_TTL):
+        _cache.move_to_end(ref)
+        return ref
+    await redis_client.set(_key(ref), payload, ex=CONTEXT_TTL)
+    _remember(ref, context)
+    return ref
+
+
+async def loadContext(ref: str) -> Dict[str, Any]:
+    if QUEUE_BACKEND == "memory":
+        expires_at, context = _local_blobs.get(ref, (0, None))
+        if context is None or expires_at < time.time():
+            raise ValueError(f"Context {ref} has expired or does not exist")
+        return context
+    if ref in _cache:
+        _cache.move_to_end(ref)
+        return _cache[ref]
+    payload = await redis_client.get(_key(ref))
+    if payload is None:
+        raise ValueError(f"Context {ref} has expired or does not exist")
+    context = decode(payload)
+    _remember(ref, context)
+    return context
+
+
+async def resolveContext(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    # Jobs carry a reference to a stored context plus a small delta in
+    # "context". Jobs queued before references existed hold the full context.
+    delta = job_data.get("context") or {}
+    ref = job_data.get("contextRef")
+    if not ref:
+        return delta
+    return {**(await loadContext(ref)), **delta}
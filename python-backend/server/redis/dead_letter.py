@@ -0,0 +1,150 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from exports.redis import redis_bytes_client
+from server.redis.codec import decode, encode
+
+DEAD_LETTER_STREAM = "workflow-queue:dead"
+DEAD_LETTER_MAXLEN = int(os.getenv("DEAD_LETTER_MAXLEN", "10000"))
+DEAD_LETTER_PAGE_SIZE = 500
+
+# Used with the in-process queue, which runs without Redis. Entries are kept
+# in the shape _to_entry returns, oldest first.
+_local_entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _in_memory() -> bool:
+    # Imported here: the queue backends import this module while
+    # server.redis.index is still creating them.
+    from server.redis.index import QUEUE_BACKEND
+
+    return QUEUE_BACKEND == "memory"
+
+
+def _addLocal(job: Optional[Dict[str, Any]], fields: Dict[str, str]):
+    sequence = 1
+    if _local_entries:
+        sequence = int(next(reversed(_local_entries)).split("-")[0]) + 1
+    entry_id = f"{sequence}-0"
+    _local_entries[entry_id] = {
+        "id": entry_id,
+        "job": job,
+        "error": fields["error"],
+        "traceback": fields["traceback"],
+        "attempts": int(fields["attempts"]),
+        "failedAt": float(fields["failedAt"]),
+    }
+    while len(_local_entries) > DEAD_LETTER_MAXLEN:
+        _local_entries.popitem(last=False)
+
+
+async def snapshotContext(job_data: Any) -> Any:
+    # Dead letters outlive CONTEXT_TTL, so the job keeps its full context
+    # inline instead of a reference to a blob that may expire before it is
+    # requeued.
+    if not isinstance(job_data, dict) or not job_data.get("contextRef"):
+        return job_data
+    from server.redis.context import resolveContext
+
+    try:
+        context = await resolveContext(job_data)
+    except Exception as error:
+        print(f"Could not snapshot the context of a dead-lettered job: {error}")
+        return job_data
+    return {
+        **{key: value for key, value in job_data.items() if key != "contextRef"},
+        "context": context,
+    }
+
+
+async def addToDeadLetter(
+    job: Union[Dict[str, Any], bytes],
+    error: Any,
+    traceback_text: str = "",
+    attempts: int = 1,
+):
+    fields = {
+        "error": str(error),
+        "traceback": traceback_text,
+        "attempts": str(attempts),
+        "failedAt": str(time.time()),
+    }
+    snapshot = (
+        {
+            "id": job.get("id"),
+            "type": job.get("type"),
+            "data": await snapshotContext(job.get("data")),
+        }
+        if isinstance(job, dict)
+        else None
+    )
+    if _in_memory():
+        _addLocal(snapshot, fields)
+        print(f"Job moved to dead-letter list: {error}")
+        return
+    # Undecodable payloads are kept as-is so they can still be inspected.
+    payload = encode(snapshot) if snapshot is not None else job
+    try:
+        await redis_bytes_client.xadd(
+            DEAD_LETTER_STREAM,
+            {"job": payload, **fields},
+            maxlen=DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+        print(f"Job moved to dead-letter stream: {error}")
+    except Exception as dlq_error:
+        print(f"Error while dead-lettering job: {dlq_error}")
+
+
+def _to_entry(entry_id: bytes, fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    try:
+        job: Optional[Dict[str, Any]] = decode(fields[b"job"])
+    except Exception:
+        job = None
+    return {
+        "id": entry_id.decode(),
+        "job": job,
+        "error": fields.get(b"error", b"").decode(),
+        "traceback": fields.get(b"traceback", b"").decode(),
+        "attempts": int(fields.get(b"attempts", b"1")),
+        "failedAt": float(fields.get(b"failedAt", b"0")),
+    }
+
+
+async def scanDeadLetters() -> AsyncIterator[Dict[str, Any]]:
+    if _in_memory():
+        for entry in list(_local_entries.values()):
+            yield entry
+        return
+    start = "-"
+    while True:
+        entries = await redis_bytes_client.xrange(
+            DEAD_LETTER_STREAM, min=start, count=DEAD_LETTER_PAGE_SIZE
+        )
+        for entry_id, fields in entries:
+            yield _to_entry(entry_id, fields)
+        if len(entries) < DEAD_LETTER_PAGE_SIZE:
+            return
+        start = f"({entries[-1][0].decode()}"
+
+
+async def getDeadLetters(ids: List[str]) -> List[Dict[str, Any]]:
+    if _in_memory():
+        return [
+            _local_entries[entry_id] for entry_id in ids if entry_id in _local_entries
+        ]
+    async with redis_bytes_client.pipeline(transaction=False) as pipe:
+        for entry_id in ids:
+            pipe.xrange(DEAD_LETTER_STREAM, min=entry_id, max=entry_id)
+        results = await pipe.execute()
+    return [_to_entry(*entries[0]) for entries in results if entries]
+
+
+async def deleteDeadLetters(ids: List[str]) -> int:
+    if not ids:
+        return 0
+    if _in_memory():
+        return sum(_local_entries.pop(entry_id, None) is not None for entry_id in ids)
+    return await redis_bytes_client.xdel(DEAD_LETTER_STREAM, *ids)
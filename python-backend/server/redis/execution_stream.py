@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from exports.redis import redis_client, redis_stream_client
+from server.redis.index import QUEUE_BACKEND
+
+EXECUTION_STREAM_PREFIX = "execution"
+EXECUTION_STREAM_MAXLEN = int(os.getenv("EXECUTION_STREAM_MAXLEN", "2000"))
+EXECUTION_STREAM_TTL = int(os.getenv("EXECUTION_STREAM_TTL", "3600"))
+
+# With the in-process queue the API reads what the worker appended here. Only
+# the most recently active executions are kept.
+LOCAL_STREAMS = 256
+_local_streams: "OrderedDict[str, List[Tuple[str, Dict[str, Any]]]]" = OrderedDict()
+_local_updates = asyncio.Condition()
+
+
+def _key(execution_id: str) -> str:
+    return f"{EXECUTION_STREAM_PREFIX}:{execution_id}"
+
+
+async def publishExecutionEvent(
+    execution_id: str, event: str, data: Dict[str, Any]
+) -> None:
+    """Append a live event (token, step, ...) to the execution's stream.
+
+    Events are best effort: a failure is logged and never fails the node.
+    """
+    key = _key(execution_id)
+    if QUEUE_BACKEND == "memory":
+        entries = _local_streams.setdefault(key, [])
+        sequence = int(entries[-1][0].split("-")[0]) + 1 if entries else 1
+        entries.append((f"{sequence}-0", {"event": event, "data": data}))
+        del entries[:-EXECUTION_STREAM_MAXLEN]
+        _local_streams.move_to_end(key)
+        while len(_local_streams) > LOCAL_STREAMS:
+            _local_streams.popitem(last=False)
+        async with _local_updates:
+            _local_updates.notify_all()
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                key,
+                {"event": event, "data": json.dumps(data, default=str)},
+                maxlen=EXECUTION_STREAM_MAXLEN,
+                approximate=True,
+            )
+            pipe.expire(key, EXECUTION_STREAM_TTL)
+            await pipe.execute()
+    except Exception as error:
+        print(f"Error while publishing to execution stream {execution_id}: {error}")
+
+
+async def readExecutionEvents(
+    execution_id: str, last_id: str = "0", block_ms: int = 15000
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Events after last_id, waiting up to block_ms for new ones."""
+    key = _key(execution_id)
+    if QUEUE_BACKEND == "memory":
+
+        def newer():
+            return [
+                entry
+                for entry in _local_streams.get(key, [])
+                if int(entry[0].split("-")[0]) > int(last_id.split("-")[0])
+            ]
+
+        async with _local_updates:
+            try:
+                await asyncio.wait_for(
+                    _local_updates.wait_for(lambda: bool(newer())), block_ms / 1000
+                )
+            except asyncio.TimeoutError:
+                pass
+        return newer()
+    response = await redis_stream_client.xread({key: last_id}, block=block_ms)
+    events = []
+    for _, entries in response or []:
+        for entry_id, fields in entries:
+            events.append(
+                (
+                    entry_id,
+                    {"event": fields.get("event"), "data": json.loads(fields["data"])},
+                )
+            )
+    return events
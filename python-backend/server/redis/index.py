@@ -1,31 +1,123 @@
-import json
-from typing import Any, Dict
-from exports.redis import redis_client
-QUEUE_NAME = "workflow-queue"
+import asyncio
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from server.queue.backend import QueueBackend, create_queue_backend
+
+# "list" keeps the workflow-queue LIST, "streams" uses a consumer group on
+# workflow-stream and "memory" hands jobs over through an in-process
+# asyncio.Queue. All of them hand out the same job dict shape.
+QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "list").lower()
+RELIABLE_QUEUE = os.getenv("RELIABLE_QUEUE", "false").lower() == "true"
+VISIBILITY_TIMEOUT = int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "300"))
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+# Node types listed here get a queue of their own, consumed by a separate
+# loop in the worker, so they cannot take slots from every other node type.
+NODE_QUEUES = [
+    node_type.strip().lower()
+    for node_type in os.getenv("NODE_QUEUES", "").split(",")
+    if node_type.strip()
+]
+
+queue_backend = create_queue_backend(
+    QUEUE_BACKEND, WORKER_ID, VISIBILITY_TIMEOUT, RELIABLE_QUEUE
+)
+queue_backends: Dict[Optional[str], QueueBackend] = {None: queue_backend}
+for _node_type in NODE_QUEUES:
+    queue_backends[_node_type] = create_queue_backend(
+        QUEUE_BACKEND, WORKER_ID, VISIBILITY_TIMEOUT, RELIABLE_QUEUE, _node_type
+    )
+
+
+class QueuePushError(Exception):
+    """Jobs could not be added to the queue."""
+
+
+def backendFor(node_type: Optional[str]) -> QueueBackend:
+    return queue_backends.get(node_type, queue_backend)
 
 
 async def addToQueue(job: Dict[str, Any]):
     try:
         job_data = {"id": job["id"], "type": job["type"], "data": job["data"]}
-        redis_client.lpush(QUEUE_NAME, json.dumps(job_data))
+        await backendFor(job["type"]).push([job_data])
         print(f"Job of {job['id']} added to queue: {job['type']}")
     except Exception as error:
         print(f"Error while entering the queue: {error}")
+        raise QueuePushError(str(error)) from error
+
+
+async def addManyToQueue(jobs: List[Dict[str, Any]]):
+    if not jobs:
+        return
+    try:
+        batches: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for job in jobs:
+            queue = job["type"] if job["type"] in queue_backends else None
+            batches.setdefault(queue, []).append(
+                {"id": job["id"], "type": job["type"], "data": job["data"]}
+            )
+        for queue, jobs_data in batches.items():
+            await queue_backends[queue].push(jobs_data)
+        print(f"{len(jobs)} jobs added to queue: {[job['id'] for job in jobs]}")
+    except Exception as error:
+        print(f"Error while entering the queue: {error}")
+        raise QueuePushError(str(error)) from error
 
 
-async def getFromQueue(timeout: int = 0):
+async def getFromQueue(
+    timeout: int = 0, node_type: Optional[str] = None, count: int = 1
+):
     try:
-        res = redis_client.brpop(QUEUE_NAME, timeout)
-        if res:
-            return json.loads(res[1])
-        return None
+        return await queue_backends[node_type].pop(timeout, count)
     except Exception as error:
         print(f"Error while getting from queue: {error}")
 
 
-async def clearQueue():
+async def ackJob(job: Dict[str, Any], node_type: Optional[str] = None):
+    if not job.get("receipt"):
+        return
+    try:
+        await queue_backends[node_type].ack(job)
+    except Exception as error:
+        print(f"Error while acknowledging job {job.get('id')}: {error}")
+
+
+async def nackJob(job: Dict[str, Any], node_type: Optional[str] = None):
     try:
-        redis_client.delete(QUEUE_NAME)
-        print(f"Queue {QUEUE_NAME} successfully deleted")
+        await queue_backends[node_type].nack(job)
     except Exception as error:
-        print(f"Error while clearing the queue: {error}")
+        # Still unacked, so maintenance reclaims it later.
+        print(f"Error while returning job {job.get('id')} to the queue: {error}")
+
+
+async def runQueueMaintenance():
+    if QUEUE_BACKEND == "memory" or (QUEUE_BACKEND == "list" and not RELIABLE_QUEUE):
+        return
+    interval = max(VISIBILITY_TIMEOUT // 3, 1)
+    while True:
+        for backend in queue_backends.values():
+            try:
+                await backend.maintain()
+            except Exception as error:
+                print(f"Error during queue maintenance: {error}")
+        await asyncio.sleep(interval)
+
+
+async def releaseWorker():
+    for backend in queue_backends.values():
+        try:
+            await backend.release()
+        except Exception as error:
+            print(f"Error while releasing worker {WORKER_ID}: {error}")
+
+
+async def clearQueue():
+    for backend in queue_backends.values():
+        try:
+            await backend.clear()
+        except Exception as error:
+            print(f"Error while clearing the queue: {error}")
+    print(f"Queue backend {queue_backend.name} successfully cleared")
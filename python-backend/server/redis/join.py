@@ -0,0 +1,87 @@
+from typing import Any, Dict, Optional
+
+from exports.redis import redis_bytes_client as redis_client
+from server.redis.codec import MAGIC, decode, encode
+from server.redis.context import loadContext
+from server.redis.index import QUEUE_BACKEND
+
+JOIN_PREFIX = "workflow-join"
+
+# Records one branch's context and, once every expected branch has arrived,
+# hands all of them back to exactly one caller and forgets the join. Keying
+# by predecessor makes a redelivered branch count only once.
+# A branch may pause on a form or a reply for longer than any TTL, so pending
+# joins do not expire. They hold their contexts inline rather than references
+# to expiring blobs, and are listed per execution so clearJoins can drop them
+# when it ends.
+ARRIVE_SCRIPT = """
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+if redis.call('HLEN', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('SADD', KEYS[2], KEYS[1])
+    return false
+end
+local branches = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], KEYS[1])
+return branches
+"""
+arrive_script = redis_client.register_script(ARRIVE_SCRIPT)
+
+_local_joins: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+
+def _key(execution_id: str, node_id: str) -> str:
+    return f"{JOIN_PREFIX}:{execution_id}:{node_id}"
+
+
+def _index_key(execution_id: str) -> str:
+    return f"{JOIN_PREFIX}:{execution_id}"
+
+
+async def _branch_context(value: bytes) -> Dict[str, Any]:
+    # Joins started before contexts were stored inline hold a context ref.
+    if value.startswith(MAGIC):
+        return decode(value)
+    return await loadContext(value.decode())
+
+
+async def arriveAtJoin(
+    execution_id: str,
+    node_id: str,
+    predecessor_id: str,
+    context: Dict[str, Any],
+    expected: int,
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Each branch's context by predecessor once all have arrived, else None."""
+    key = _key(execution_id, node_id)
+    if QUEUE_BACKEND == "memory":
+        branches = _local_joins.setdefault(key, {})
+        branches[predecessor_id] = context
+        if len(branches) < expected:
+            return None
+        return _local_joins.pop(key)
+    res = await arrive_script(
+        keys=[key, _index_key(execution_id)],
+        args=[predecessor_id, encode(context), expected],
+    )
+    if not res:
+        return None
+    return {
+        predecessor.decode(): await _branch_context(value)
+        for predecessor, value in zip(res[::2], res[1::2])
+    }
+
+
+async def clearJoins(execution_id: str) -> None:
+    """Forget the joins an execution left waiting, once it has ended."""
+    if QUEUE_BACKEND == "memory":
+        prefix = _key(execution_id, "")
+        for key in [key for key in _local_joins if key.startswith(prefix)]:
+            del _local_joins[key]
+        return
+    try:
+        index_key = _index_key(execution_id)
+        keys = await redis_client.smembers(index_key)
+        await redis_client.delete(index_key, *keys)
+    except Exception as error:
+        print(f"Error while clearing the joins of execution {execution_id}: {error}")
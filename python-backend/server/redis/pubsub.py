@@ -0,0 +1,50 @@
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+from exports.redis import redis_client
+from server.redis.index import QUEUE_BACKEND
+
+WORKFLOW_UPDATES_CHANNEL = "workflow-updates"
+CREDENTIAL_UPDATES_CHANNEL = "credential-updates"
+
+# With the in-process queue the API and the worker share memory, so updates
+# are delivered to local subscribers directly instead of through Redis.
+_local_subscribers: Dict[str, List[Callable[[Optional[str]], None]]] = {}
+
+
+async def publishUpdate(channel: str, entity_id: str):
+    if QUEUE_BACKEND == "memory":
+        for callback in _local_subscribers.get(channel, []):
+            callback(entity_id)
+        return
+    try:
+        await redis_client.publish(channel, entity_id)
+    except Exception as error:
+        print(f"Error while publishing to {channel}: {error}")
+
+
+async def subscribeUpdates(channel: str, callback: Callable[[Optional[str]], None]):
+    # callback(None) means updates may have been missed and everything cached
+    # for the channel should be dropped.
+    if QUEUE_BACKEND == "memory":
+        _local_subscribers.setdefault(channel, []).append(callback)
+        return
+    reconnecting = False
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            if reconnecting:
+                callback(None)
+            reconnecting = True
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    callback(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            print(f"Error while listening on {channel}: {error}")
+            reconnecting = True
+        finally:
+            await pubsub.aclose()
+        await asyncio.sleep(1)
@@ -0,0 +1,29 @@
+import asyncio
+import os
+from typing import Any, Dict
+
+from server.queue.redis_delayed import SCHEDULER_BATCH_SIZE
+from server.redis.index import QUEUE_BACKEND, backendFor, queue_backends
+
+SCHEDULER_INTERVAL = float(os.getenv("SCHEDULER_INTERVAL", "0.5"))
+
+
+async def scheduleJob(job: Dict[str, Any], delay_seconds: float):
+    job_data = {"id": job["id"], "type": job["type"], "data": job["data"]}
+    await backendFor(job["type"]).schedule(job_data, delay_seconds)
+    print(f"Job of {job['id']} scheduled in {delay_seconds:.1f}s: {job['type']}")
+
+
+async def runScheduler():
+    if QUEUE_BACKEND == "memory":
+        return
+    while True:
+        busy = False
+        for backend in queue_backends.values():
+            try:
+                promoted = await backend.promote_due()
+                busy = busy or promoted >= SCHEDULER_BATCH_SIZE
+            except Exception as error:
+                print(f"Error while promoting delayed jobs: {error}")
+        if not busy:
+            await asyncio.sleep(SCHEDULER_INTERVAL)
@@ -5,6 +5,7 @@ from db.models.models import Credentials, User
 from db.models.schemas import CredentialsSchema
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import ValidationError
+from server.redis.pubsub import CREDENTIAL_UPDATES_CHANNEL, publishUpdate
 from server.routes.user import authenticate_user
 from sqlmodel import Session, select
 
@@ -101,6 +102,7 @@ async def delete_credential(
         raise HTTPException(status_code=400, detail="Credential not found")
     db.delete(credential)
     db.commit()
+    await publishUpdate(CREDENTIAL_UPDATES_CHANNEL, str(credential_uuid))
     return {
         "message": "Credential deleted Successfully",
         "credential_deleted": {"id": str(credential.id), "title": credential.title},
@@ -130,6 +132,7 @@ async def update_credentials(
     db.add(credential)
     db.commit()
     db.refresh(credential)
+    await publishUpdate(CREDENTIAL_UPDATES_CHANNEL, str(credential.id))
 
     return {
         "message": "Credentials updated successfuly",
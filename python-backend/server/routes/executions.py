@@ -1,9 +1,28 @@
-from typing import Any, Dict, Optional
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+from uuid import UUID
 
-from db.database import get_session
-from db.models.models import Execution, ExecutionStatus, User, Workflow
-from fastapi import APIRouter, Depends, HTTPException
-from server.redis.index import addToQueue
+from db.database import get_db_session, get_session
+from db.models.models import (
+    Execution,
+    ExecutionStatus,
+    NodeResult,
+    User,
+    Workflow,
+)
+from db.models.schemas import DeadLetterSelection
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from server.controller.dispatch import dispatch_successors
+from server.controller.plan import get_plan
+from server.redis.dead_letter import (
+    deleteDeadLetters,
+    getDeadLetters,
+    scanDeadLetters,
+)
+from server.redis.execution_stream import readExecutionEvents
+from server.redis.index import addManyToQueue
 from server.routes.user import authenticate_user
 from sqlmodel import Session, select
 
@@ -20,9 +39,15 @@ async def get_executions(
             select(Workflow.id).where(Workflow.user_id == user.id)
         ).all()
 
-        statement = select(Execution).where(
-            Execution.workflow_id.in_(user_workflows)
-        )
+        # Only summary columns; node outputs are read per execution and node.
+        statement = select(
+            Execution.id,
+            Execution.workflow_id,
+            Execution.status,
+            Execution.tasks_done,
+            Execution.total_tasks,
+            Execution.created_at,
+        ).where(Execution.workflow_id.in_(user_workflows))
         executions = db.exec(statement).all()
 
         if not executions:
@@ -39,7 +64,7 @@ async def get_executions(
                     "status": execution.status,
                     "tasks_done": execution.tasks_done,
                     "total_tasks": execution.total_tasks,
-                    "result": execution.result,
+                    "created_at": execution.created_at.isoformat(),
                 }
                 for execution in executions
             ],
@@ -50,6 +75,99 @@ async def get_executions(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+async def select_dead_letters(
+    selection: DeadLetterSelection, db: Session, user: User
+) -> List[Dict[str, Any]]:
+    # Only entries whose job belongs to one of the user's workflows are visible.
+    workflow_ids = {
+        str(workflow_id)
+        for workflow_id in db.exec(
+            select(Workflow.id).where(Workflow.user_id == user.id)
+        ).all()
+    }
+    if selection.ids:
+        entries = await getDeadLetters(selection.ids)
+    else:
+        entries = [entry async for entry in scanDeadLetters()]
+    return [
+        entry
+        for entry in entries
+        if entry["job"]
+        and (entry["job"].get("data") or {}).get("workflowId") in workflow_ids
+    ]
+
+
+@router.get("/executions/dead-letters")
+async def get_dead_letters(
+    limit: int = 100,
+    db: Session = Depends(get_session),
+    user: User = Depends(authenticate_user),
+):
+    try:
+        entries = await select_dead_letters(DeadLetterSelection(), db, user)
+        entries.reverse()
+        return {"deadLetters": entries[:limit], "total": len(entries)}
+    except Exception as exe:
+        print(f"Error while getting dead letters: {exe}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@router.delete("/executions/dead-letters")
+async def purge_dead_letters(
+    selection: Optional[DeadLetterSelection] = None,
+    db: Session = Depends(get_session),
+    user: User = Depends(authenticate_user),
+):
+    try:
+        entries = await select_dead_letters(
+            selection or DeadLetterSelection(), db, user
+        )
+        purged = await deleteDeadLetters([entry["id"] for entry in entries])
+        return {"message": "Dead letters purged", "purged": purged}
+    except Exception as exe:
+        print(f"Error while purging dead letters: {exe}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@router.post("/executions/dead-letters/requeue")
+async def requeue_dead_letters(
+    selection: Optional[DeadLetterSelection] = None,
+    db: Session = Depends(get_session),
+    user: User = Depends(authenticate_user),
+):
+    try:
+        entries = await select_dead_letters(
+            selection or DeadLetterSelection(), db, user
+        )
+        if not entries:
+            return {"message": "No dead letters to requeue", "requeued": 0}
+        execution_ids = {
+            UUID(entry["job"]["data"]["executionId"])
+            for entry in entries
+            if entry["job"]["data"].get("executionId")
+        }
+        failed_executions = db.exec(
+            select(Execution).where(
+                Execution.id.in_(execution_ids),
+                Execution.status == ExecutionStatus.FAILED,
+            )
+        ).all()
+        for execution in failed_executions:
+            execution.status = ExecutionStatus.RUNNING
+            db.add(execution)
+        db.commit()
+        jobs = [
+            {**entry["job"], "data": {**entry["job"]["data"], "attempt": 1}}
+            for entry in entries
+        ]
+        await addManyToQueue(jobs)
+        await deleteDeadLetters([entry["id"] for entry in entries])
+        return {"message": "Dead letters requeued", "requeued": len(jobs)}
+    except Exception as exe:
+        print(f"Error while requeueing dead letters: {exe}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
 @router.get("/executions/{execution_id}")
 async def get_execution_by_id(
     execution_id: str,
@@ -81,6 +199,141 @@ async def get_execution_by_id(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+def get_user_execution(execution_id: str, db: Session, user: User) -> Execution:
+    execution = db.get(Execution, execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    workflow = db.get(Workflow, execution.workflow_id)
+    if not workflow or workflow.user_id != user.id:
+        raise HTTPException(
+            status_code=403, detail="Not authorized to access this execution"
+        )
+    return execution
+
+
+@router.get("/executions/{execution_id}/nodes")
+async def get_execution_nodes(
+    execution_id: str,
+    db: Session = Depends(get_session),
+    user: User = Depends(authenticate_user),
+):
+    try:
+        execution = get_user_execution(execution_id, db, user)
+        node_results = db.exec(
+            select(
+                NodeResult.node_id,
+                NodeResult.node_type,
+                NodeResult.status,
+                NodeResult.started_at,
+                NodeResult.completed_at,
+                NodeResult.duration_ms,
+                NodeResult.error,
+            )
+            .where(NodeResult.execution_id == execution.id)
+            .order_by(NodeResult.completed_at)
+        ).all()
+        return {
+            "nodes": [
+                {
+                    "node_id": node.node_id,
+                    "node_type": node.node_type,
+                    "status": node.status,
+                    "started_at": node.started_at.isoformat()
+                    if node.started_at
+                    else None,
+                    "completed_at": node.completed_at.isoformat(),
+                    "duration_ms": node.duration_ms,
+                    "error": node.error,
+                }
+                for node in node_results
+            ],
+            "total": len(node_results),
+        }
+    except HTTPException:
+        raise
+    except Exception as exe:
+        print(f"Error while getting execution nodes: {exe}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@router.get("/executions/{execution_id}/nodes/{node_id}")
+async def get_execution_node_result(
+    execution_id: str,
+    node_id: str,
+    db: Session = Depends(get_session),
+    user: User = Depends(authenticate_user),
+):
+    try:
+        execution = get_user_execution(execution_id, db, user)
+        node_result = db.get(NodeResult, (execution.id, node_id))
+        if not node_result:
+            raise HTTPException(status_code=404, detail="Node result not found")
+        return {
+            "node_id": node_result.node_id,
+            "node_type": node_result.node_type,
+            "status": node_result.status,
+            "started_at": node_result.started_at.isoformat()
+            if node_result.started_at
+            else None,
+            "completed_at": node_result.completed_at.isoformat(),
+            "duration_ms": node_result.duration_ms,
+            "result": node_result.result,
+            "error": node_result.error,
+        }
+    except HTTPException:
+        raise
+    except Exception as exe:
+        print(f"Error while getting node result: {exe}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+STREAM_END_STATUSES = {
+    ExecutionStatus.COMPLETED,
+    ExecutionStatus.FAILED,
+    ExecutionStatus.PAUSED,
+}
+
+
+def get_execution_status(execution_id: str) -> Optional[ExecutionStatus]:
+    with get_db_session() as db:
+        execution = db.get(Execution, execution_id)
+        return execution.status if execution else None
+
+
+async def stream_execution_events(execution_id: str, last_id: str):
+    while True:
+        events = await readExecutionEvents(execution_id, last_id, 5000)
+        for event_id, event in events:
+            last_id = event_id
+            data = json.dumps(event["data"], default=str)
+            yield f"id: {event_id}\nevent: {event['event']}\ndata: {data}\n\n"
+        if events:
+            continue
+        # Only checked once the stream is idle, so every event written before
+        # the execution finished has been sent. The session is synchronous,
+        # so the query runs in a thread.
+        status = await asyncio.to_thread(get_execution_status, execution_id)
+        if status is None or status in STREAM_END_STATUSES:
+            yield f"event: end\ndata: {json.dumps({'status': status})}\n\n"
+            return
+        yield ": keep-alive\n\n"
+
+
+@router.get("/executions/{execution_id}/stream")
+async def stream_execution(
+    execution_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: Session = Depends(get_session),
+    user: User = Depends(authenticate_user),
+):
+    execution = get_user_execution(execution_id, db, user)
+    return StreamingResponse(
+        stream_execution_events(str(execution.id), last_event_id or "0"),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/executions/{execution_id}/resume")
 async def resume_workflow(
     execution_id: str,
@@ -119,43 +372,28 @@ async def resume_workflow(
             )
 
         nodes = workflow.nodes
-        connections = workflow.connections
+        plan = get_plan(workflow)
         original_context = {}
-        node_results = execution.result.get("nodeResults", {})
-        for node_id, node_result in node_results.items():
-            node_data = nodes.get(node_id, {})
-            if node_data.get("type") == "webhook":
-                original_context = node_result.get("result", {})
+        node_results = db.exec(
+            select(NodeResult).where(NodeResult.execution_id == execution.id)
+        ).all()
+        for node_result in node_results:
+            if plan["types"].get(node_result.node_id) == "webhook":
+                original_context = node_result.result or {}
                 break
-        next_node_ids = connections.get(paused_node_id, [])
-        for next_node_id in next_node_ids:
-            next_node_data = nodes.get(next_node_id)
-            if not next_node_data:
-                continue
-
-            # Get node type from the correct location
-            node_type = (
-                next_node_data.get("type", "")
-                or next_node_data.get("data", {}).get("nodeType", "")
-            ).lower()
-
-            job = {
-                "id": f"{next_node_id}-{execution.id}",
-                "type": node_type,
-                "data": {
-                    "executionId": str(execution.id),
-                    "workflowId": str(execution.workflow_id),
-                    "nodeId": next_node_id,
-                    "credentialId": next_node_data.get("credentials"),
-                    "nodeData": next_node_data,
-                    "context": {
-                        **original_context,
-                        "form": data,
-                    },
-                    "connections": connections.get(next_node_id, []),
-                },
-            }
-            await addToQueue(job)
+        await dispatch_successors(
+            plan,
+            nodes,
+            {
+                "executionId": str(execution.id),
+                "workflowId": str(execution.workflow_id),
+                "workflowVersion": workflow.version,
+                "trigger": (execution.result or {}).get("trigger", "manual"),
+            },
+            paused_node_id,
+            {**original_context, "form": data},
+            db,
+        )
 
         return {"message": "Workflow resumed"}
     except HTTPException:
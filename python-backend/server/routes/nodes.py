@@ -1,27 +1,11 @@
-import importlib.util
-import os
-
 from fastapi import APIRouter
 
+from Workers.nodes.registry import get_node_details
+
 router = APIRouter()
 
 
 @router.get("/nodes/types")
 async def get_node_types():
-    available_nodes = []
-    nodes_dir = os.path.join(os.path.dirname(__file__), "..", "..", "Workers", "nodes")
-
-    for filename in os.listdir(nodes_dir):
-        if filename.endswith(".py") and not filename.startswith("__"):
-            module_name = filename[:-3]
-            module_path = os.path.join(nodes_dir, filename)
-
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-
-                if hasattr(module, "node_details"):
-                    available_nodes.append(module.node_details)
-
+    available_nodes = get_node_details()
     return {"nodes": available_nodes, "total": len(available_nodes)}
@@ -1,11 +1,12 @@
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from db.database import get_session
-from db.models.models import Execution, ExecutionStatus, Workflow
-from server.redis.index import addToQueue
+from db.models.models import Execution, ExecutionStatus, NodeResult, Workflow
+from server.controller.dispatch import dispatch_successors
+from server.controller.plan import get_plan
 
 router = APIRouter()
 
@@ -33,33 +34,28 @@ async def resume_workflow(
                 status_code=400, detail="No paused node found in workflow"
             )
         nodes = workflow.nodes
-        connections = workflow.connections
+        plan = get_plan(workflow)
         original_context = {}
-        node_results = execution.result.get("nodeResults", {})
-        for node_id, node_result in node_results.items():
-            original_context.update(node_result.get("result", {}))
-        next_node_ids = connections.get(paused_node_id, [])
-        for next_node_id in next_node_ids:
-            next_node_data = nodes.get(next_node_id)
-            if not next_node_data:
-                continue
-            job = {
-                "id": f"{next_node_id}-{execution.id}",
-                "type": next_node_data.get("type", "").lower(),
-                "data": {
-                    "executionId": str(execution.id),
-                    "workflowId": str(execution.workflow_id),
-                    "nodeId": next_node_id,
-                    "credentialId": next_node_data.get("credentials"),
-                    "nodeData": next_node_data,
-                    "context": {
-                        **original_context,
-                        "data": data,
-                    },
-                    "connections": connections.get(next_node_id, []),
-                },
-            }
-            await addToQueue(job)
+        node_results = db.exec(
+            select(NodeResult.result)
+            .where(NodeResult.execution_id == execution.id)
+            .order_by(NodeResult.completed_at)
+        ).all()
+        for node_result in node_results:
+            original_context.update(node_result or {})
+        await dispatch_successors(
+            plan,
+            nodes,
+            {
+                "executionId": str(execution.id),
+                "workflowId": str(execution.workflow_id),
+                "workflowVersion": workflow.version,
+                "trigger": (execution.result or {}).get("trigger", "manual"),
+            },
+            paused_node_id,
+            {**original_context, "data": data},
+            db,
+        )
         return {"message": "Workflow Resumed"}
     except Exception as e:
         print(f"Error while resuming the workflow: {e}")
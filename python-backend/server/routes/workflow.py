@@ -15,7 +15,10 @@ from db.models.models import (
     Workflow,
 )
 from db.models.schemas import WorkflowCreate
-from server.redis.index import addToQueue
+from server.controller.dispatch import dispatch_start_nodes
+from server.controller.plan import compile_plan, get_plan
+from server.redis.join import clearJoins
+from server.redis.pubsub import WORKFLOW_UPDATES_CHANNEL, publishUpdate
 from server.routes.user import authenticate_user
 
 router = APIRouter()
@@ -40,47 +43,39 @@ async def execute_workflow(
                 status_code=403, detail="Not authorized to execute this workflow"
             )
         nodes: Dict[str, Any] = workflow.nodes
-        connections: Dict[str, Any] = workflow.connections
-        executable_node_types = {"email", "telegram", "form", "webhook", "agent"}
-        total_tasks = sum(
-            1
-            for node in nodes.values()
-            if node.get("type", "").lower() in executable_node_types
-            or node.get("data", {}).get("nodeType", "").lower() in executable_node_types
-        )
+        plan = get_plan(workflow)
+        total_tasks = plan["totalTasks"]
         execution = Execution(
             workflow_id=UUID(workflow_id),
             status=ExecutionStatus.RUNNING,
             tasks_done=0,
             total_tasks=total_tasks,
-            result={"triggerPayload": context, "nodeResults": {}},
+            result={"trigger": "manual", "triggerPayload": context},
         )
         db.add(execution)
         db.commit()
         db.refresh(execution)
-        starting_node = find_starting_node(nodes, connections)
-        for node_id in starting_node:
-            node_data = nodes[node_id]
-            job = {
-                "id": f"{node_id}-{execution.id}",
-                "type": node_data.get("type", "").lower(),
-                "data": {
-                    "executionId": str(execution.id),
-                    "workflowId": str(execution.workflow_id),
-                    "nodeId": node_id,
-                    "credentialId": node_data.get("credentials"),
-                    "nodeData": node_data,
-                    "context": context,
-                    "connections": connections.get(node_id, []),
-                },
-            }
-            await addToQueue(job)
+        await dispatch_start_nodes(
+            plan,
+            nodes,
+            {
+                "executionId": str(execution.id),
+                "workflowId": str(execution.workflow_id),
+                "workflowVersion": workflow.version,
+                "trigger": "manual",
+            },
+            plan["startNodes"],
+            context,
+            db,
+        )
         return {
             "message": "Workflow execution started",
             "executionId": str(execution.id),
             "workflowId": workflow_id,
             "totalTasks": total_tasks,
         }
+    except HTTPException:
+        raise
     except Exception as error:
         print(f"Error while running the workflow: {error}")
         raise HTTPException(status_code=400, detail="Error occured")
@@ -128,6 +123,8 @@ async def create_workflow(
     user: User = Depends(authenticate_user),
 ):
     try:
+        nodes = {node_id: node.dict() for node_id, node in workflow.nodes.items()}
+        plan = compile_plan(nodes, workflow.connections)
         webhook_id = None
         if workflow.trigger_type == TriggerType.WEBHOOK:
             new_webhook = Webhook(
@@ -140,16 +137,19 @@ async def create_workflow(
             webhook_id = new_webhook.id
         new_workflow = Workflow(
             title=workflow.title,
-            nodes=workflow.nodes,
+            nodes=nodes,
             connections=workflow.connections,
             trigger_type=workflow.trigger_type,
             user_id=user.id,
             webhook_id=webhook_id,
+            plan=plan,
         )
         db.add(new_workflow)
         db.commit()
         db.refresh(new_workflow)
         return new_workflow
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error while adding workflow to db: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -170,6 +170,10 @@ async def update_workflow(
             raise HTTPException(
                 status_code=403, detail="Not authorized to update this workflow"
             )
+        nodes = {
+            node_id: node.dict() for node_id, node in workflow_data.nodes.items()
+        }
+        plan = compile_plan(nodes, workflow_data.connections)
         if (
             workflow_data.trigger_type == TriggerType.WEBHOOK
             and not workflow.webhook_id
@@ -180,15 +184,18 @@ async def update_workflow(
             db.refresh(new_Webhook)
             workflow.webhook_id = new_Webhook.id
         workflow.title = workflow_data.title
-        workflow.nodes = {
-            node_id: node.dict() for node_id, node in workflow_data.nodes.items()
-        }
+        workflow.nodes = nodes
         workflow.connections = workflow_data.connections
         workflow.trigger_type = workflow_data.trigger_type
+        workflow.plan = plan
+        workflow.version = (workflow.version or 1) + 1
         db.add(workflow)
         db.commit()
         db.refresh(workflow)
+        await publishUpdate(WORKFLOW_UPDATES_CHANNEL, str(workflow.id))
         return workflow
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error while updating workflow: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -249,20 +256,21 @@ async def delete_workflow(
         executions = db.exec(
             select(Execution).where(Execution.workflow_id == workflow_id)
         ).all()
+        open_executions = []
         for execution in executions:
+            if execution.status not in (
+                ExecutionStatus.COMPLETED,
+                ExecutionStatus.FAILED,
+            ):
+                open_executions.append(str(execution.id))
             db.delete(execution)
 
         db.delete(workflow)
         db.commit()
+        for execution_id in open_executions:
+            await clearJoins(execution_id)
+        await publishUpdate(WORKFLOW_UPDATES_CHANNEL, workflow_id)
         return {"message": "Workflow deleted successfully"}
     except Exception as e:
         print(f"Error while deleting workflow: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
-
-
-def find_starting_node(nodes: Dict[str, Any], connections: Dict[str, Any]):
-    has_incoming = set()
-    for values in connections.values():
-        for v in values:
-            has_incoming.add(v)
-    return [node_id for node_id in nodes.keys() if node_id not in has_incoming]
@@ -15,7 +15,7 @@ log() {
 
 check_redis() {
   log "Checking Redis connectivity..."
-  if uv run python -c "from exports.redis import redis_client; redis_client.ping()" 2>/dev/null; then
+  if uv run python -c "import asyncio; from exports.redis import redis_client; asyncio.run(redis_client.ping())" 2>/dev/null; then
     log "Redis OK"
     return 0
   else
@@ -46,6 +46,16 @@ check_worker_health() {
     return 1
   fi
 
+  if [ -f /tmp/worker-health.json ]; then
+    local healthy=$(uv run python -c "import json; print(json.load(open('/tmp/worker-health.json'))['healthy'])" 2>/dev/null || echo 0)
+    if [ "$healthy" -eq 0 ]; then
+      log "Worker supervisor $WORKER_PID has no healthy worker processes"
+      return 1
+    fi
+    log "Worker supervisor $WORKER_PID is alive ($healthy healthy worker processes)"
+    return 0
+  fi
+
   if [ -f /tmp/worker.log ]; then
     local log_size=$(wc -l < /tmp/worker.log 2>/dev/null || echo 0)
     if [ "$log_size" -gt 0 ]; then
@@ -67,7 +77,7 @@ start_worker() {
     sleep 2
   fi
 
-  PYTHONUNBUFFERED=1 uv run python Workers/index.py > /tmp/worker.log 2>&1 &
+  PYTHONUNBUFFERED=1 uv run python Workers/supervisor.py > /tmp/worker.log 2>&1 &
   WORKER_PID=$!
   log "Worker UV process started with PID: $WORKER_PID"
 
@@ -118,7 +128,7 @@ monitor_processes() {
   while true; do
     sleep $HEALTH_CHECK_INTERVAL
 
-    if ! check_worker_health; then
+    if [ "$QUEUE_BACKEND" != "memory" ] && ! check_worker_health; then
       log "WARNING: Worker is not healthy!"
       WORKER_RESTART_COUNT=$((WORKER_RESTART_COUNT + 1))
 
@@ -171,7 +181,9 @@ log "Performing initial health checks..."
 check_redis || log "WARNING: Redis not accessible at startup"
 check_database || log "WARNING: Database not accessible at startup"
 
-if ! start_worker; then
+if [ "$QUEUE_BACKEND" = "memory" ]; then
+  log "QUEUE_BACKEND=memory: the server runs the worker loop in-process"
+elif ! start_worker; then
   log "CRITICAL: Initial worker startup failed!"
   log "Waiting 10 seconds before retry..."
   sleep 10